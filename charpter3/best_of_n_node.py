@@ -0,0 +1,76 @@
+import asyncio
+import inspect
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+# 单个候选生成函数：输入文本，返回生成内容
+Generator = Callable[[str], Awaitable[str]]
+# 评分函数：输入生成内容，返回分数（支持同步或异步）
+Scorer = Callable[[str], Union[float, Awaitable[float]]]
+
+
+class BestOfNNode:
+    """Best-of-N节点：并发启动N个候选生成，边完成边评分，
+    一旦有候选达到阈值立即返回并取消其余候选；若都未达标则返回最高分候选。"""
+
+    def __init__(
+        self,
+        generators: List[Generator],
+        scorer: Scorer,
+        threshold: float,
+        input_key: str = "input_text",
+        output_key: str = "output_text",
+        score_key: str = "score",
+        attempts_key: Optional[str] = None,
+    ):
+        if not generators:
+            raise ValueError("generators不能为空")
+        self.generators = generators
+        self.scorer = scorer
+        self.threshold = threshold
+        self.input_key = input_key
+        self.output_key = output_key
+        self.score_key = score_key
+        self.attempts_key = attempts_key
+
+    async def _score(self, text: str) -> float:
+        score = self.scorer(text)
+        if inspect.isawaitable(score):
+            score = await score
+        return float(score)
+
+    async def __call__(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        text = state[self.input_key]
+        tasks = [asyncio.create_task(gen(text)) for gen in self.generators]
+        best_text: Optional[str] = None
+        best_score = float("-inf")
+        attempts = 0
+        last_error: Optional[BaseException] = None
+        try:
+            # 按完成顺序评分，先完成的候选先参与比较
+            for finished in asyncio.as_completed(tasks):
+                try:
+                    candidate = await finished
+                except Exception as e:
+                    last_error = e  # 单个候选失败不影响其他候选
+                    continue
+                attempts += 1
+                score = await self._score(candidate)
+                if score > best_score:
+                    best_text, best_score = candidate, score
+                if score >= self.threshold:
+                    break  # 提前结束
+        finally:
+            # 取消仍在运行的候选，避免浪费模型资源
+            pending = [t for t in tasks if not t.done()]
+            for t in pending:
+                t.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        if best_text is None:
+            raise RuntimeError(f"所有候选生成均失败：{last_error}") from last_error
+
+        update = {self.output_key: best_text, self.score_key: best_score}
+        if self.attempts_key:
+            update[self.attempts_key] = attempts
+        return update
@@ -0,0 +1,66 @@
+from langgraph.graph import StateGraph, END
+from typing import TypedDict
+from langchain_ollama import ChatOllama
+from best_of_n_node import BestOfNNode
+import asyncio
+import random
+
+# 定义工作流状态结构
+class BestOfNState(TypedDict):
+    input_text: str
+    output_text: str
+    score: float
+    attempts: int
+
+# 候选数量与合格阈值
+N_CANDIDATES = 3
+SCORE_THRESHOLD = 0.6
+
+# 为每个候选准备不同温度与随机种子的模型，保证候选之间存在差异
+candidate_llms = [
+    ChatOllama(model="qwen3:8b", temperature=0.3 + 0.2 * i, seed=i, base_url="http://192.168.1.60:11434")
+    for i in range(N_CANDIDATES)
+]
+
+# 生成函数工厂：每个候选绑定一个模型
+def make_generator(llm: ChatOllama):
+    async def generate(text: str) -> str:
+        response = await llm.ainvoke(f"缩句：{text}")
+        return response.content
+    return generate
+
+# 评估生成结果的质量，随机打分
+def review(text: str) -> float:
+    score = round(random.uniform(0.3, 1.0), 2)  # 模拟评估打分
+    print(f"评估得分: {score}")
+    return score
+
+# Best-of-N生成节点：并发生成，达到阈值即提前结束并取消其余候选
+best_of_n = BestOfNNode(
+    generators=[make_generator(llm) for llm in candidate_llms],
+    scorer=review,
+    threshold=SCORE_THRESHOLD,
+    attempts_key="attempts",
+)
+
+# 构建LangGraph状态图
+builder = StateGraph(BestOfNState)
+builder.add_node("generate", best_of_n)
+builder.set_entry_point("generate")
+builder.add_edge("generate", END)
+graph = builder.compile()
+
+# 执行状态图
+async def main():
+    initial_state: BestOfNState = {
+        "input_text": "要站在推进强国建设、民族复兴伟业的战略高度，立足客观条件，发挥比较优势，坚持稳中求进、梯度培育，推动我国未来产业发展不断取得新突破。",
+        "output_text": "",
+        "score": 0.0,
+        "attempts": 0
+    }
+    final_state = await graph.ainvoke(initial_state)
+    print("最终内容输出:", final_state["output_text"])
+    print("最终评估得分:", final_state["score"])
+    print("评估候选数:", final_state["attempts"])
+
+asyncio.run(main())
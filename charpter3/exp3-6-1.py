@@ -0,0 +1,90 @@
+from langgraph.graph import StateGraph, END
+from langchain_ollama import ChatOllama
+from typing import TypedDict
+from refine_guard import RefinementGuard
+import random
+
+# 定义工作流状态结构
+class LoopState(TypedDict):
+    input_text: str
+    output_text: str
+    score: float
+    retry_count: int
+    stopped: bool
+
+# 初始化语言模型（temperature=0，相同提示词的重试结果必然相同）
+llm = ChatOllama(model="qwen3:8b", temperature=0, base_url="http://192.168.1.60:11434")
+
+# 生成调用守卫：检测确定性重复调用，扰动提示词与温度（可改为"cache"或"stop"）
+guard = RefinementGuard(llm, policy="perturb")
+
+# 内容生成节点
+def generate_summary(state: LoopState) -> LoopState:
+    content = state["input_text"]
+    feedback = None
+    if state["retry_count"] > 0:
+        feedback = f"上一版评分为{state['score']:.2f}，请在保持准确的前提下更精炼、覆盖更多要点。"
+    response = guard.generate(
+        f"请根据以下内容生成摘要：\n{content}",
+        previous=state["output_text"],
+        feedback=feedback,
+    )
+    if response is None:
+        # 重试只会得到相同结果，提前结束循环并保留上一版摘要
+        return {**state, "stopped": True}
+    return {
+        **state,
+        "output_text": response,
+        "score": 0.0  # 初始评分
+    }
+
+# 重新评估节点，打分评分机制（或可用LLM评分）
+def evaluate_summary(state: LoopState) -> LoopState:
+    if state["stopped"]:
+        return state
+    score = random.uniform(0.4, 1.0)  # 模拟评分，实际可用LLM进行评分
+    print(f"评估摘要，当前评分：{score:.2f}")
+    return {
+        **state,
+        "score": score,
+        "retry_count": state["retry_count"] + 1
+    }
+
+# 路由函数：若分数过低且未超过3次重试，则自循环回生成节点
+def review_decision(state: LoopState) -> str:
+    if state["stopped"]:
+        print("重试将产生相同结果，提前结束流程。")
+        return "end"
+    if state["score"] < 0.7 and state["retry_count"] < 3:
+        print("评分过低，重新生成摘要...")
+        return "generate"
+    print("摘要质量达标，结束流程。")
+    return "end"
+
+# 构建状态图
+builder = StateGraph(LoopState)
+builder.add_node("generate", generate_summary)
+builder.add_node("evaluate", evaluate_summary)
+builder.add_edge("generate", "evaluate")
+builder.add_conditional_edges("evaluate", review_decision, {
+    "generate": "generate",
+    "end": END
+})
+builder.set_entry_point("generate")
+graph = builder.compile()
+
+# 初始化状态，开始执行
+initial_state = {
+    "input_text": "Langgraph是一个高度模块化的框架，可用于构建复杂的语言模型工作流和条件编排工作流。",
+    "output_text": "",
+    "score": 0.0,
+    "retry_count": 0,
+    "stopped": False
+}
+with guard.run():  # 每次运行使用独立的缓存与扰动级别
+    final_state = graph.invoke(initial_state)
+
+print("最终得分：", final_state["score"])
+print("最终摘要：", final_state["output_text"])
+print("重试次数：", final_state["retry_count"])
+print("生成统计：", guard.report())
@@ -0,0 +1,120 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Literal, Optional, Tuple
+
+# 重复确定性调用的处理策略：
+# cache   - 直接返回缓存结果，不再调用模型
+# perturb - 将反馈拼入提示词并提高温度，使重试产生不同结果
+# stop    - 提前终止循环
+# none    - 不做拦截（仅统计浪费的相同重生成，用于对比）
+Policy = Literal["cache", "perturb", "stop", "none"]
+
+
+class _RunMemo:
+    """单次运行内的生成缓存与扰动级别，运行结束即丢弃"""
+
+    def __init__(self) -> None:
+        self.cache: "OrderedDict[Tuple[str, Optional[float]], str]" = OrderedDict()
+        self.perturb_level = 0
+
+
+class RefinementGuard:
+    """包装循环中的LLM生成调用，识别"相同模型参数+相同提示词"的确定性重试，
+    按策略命中缓存、扰动请求或提前终止，并统计浪费的相同重生成次数。
+
+    缓存与扰动级别只在一次运行内有效：每次执行图都应放在guard.run()中，
+    不同运行（包括并发运行）互不影响；每次运行最多缓存max_cache条结果。"""
+
+    def __init__(
+        self,
+        llm: Any,
+        policy: Policy = "perturb",
+        temperature_step: float = 0.3,
+        max_temperature: float = 1.0,
+        max_cache: int = 128,
+    ):
+        self.llm = llm
+        self.policy = policy
+        self.temperature_step = temperature_step
+        self.max_temperature = max_temperature
+        self.max_cache = max_cache
+        self._memo: ContextVar[Optional[_RunMemo]] = ContextVar(f"refine_guard_{id(self)}", default=None)
+        self._llms: Dict[float, Any] = {}
+        self.metrics = {
+            "calls": 0,                 # 生成请求总数
+            "llm_calls": 0,             # 实际调用模型次数
+            "repeated_deterministic": 0,  # 识别出的确定性重复请求
+            "cache_hits": 0,
+            "perturbed": 0,
+            "early_stops": 0,
+            "wasted_identical": 0,      # 实际调用模型却得到完全相同结果的次数
+        }
+
+    @contextmanager
+    def run(self) -> Iterator[None]:
+        """开始一次新的运行：缓存与扰动级别从零开始"""
+        token = self._memo.set(_RunMemo())
+        try:
+            yield
+        finally:
+            self._memo.reset(token)
+
+    @staticmethod
+    def is_deterministic(temperature: Optional[float]) -> bool:
+        return temperature is not None and temperature <= 0
+
+    def _llm_at(self, temperature: float) -> Any:
+        # 按温度复用模型副本，避免每次重试重新构造客户端
+        if temperature not in self._llms:
+            self._llms[temperature] = self.llm.model_copy(update={"temperature": temperature})
+        return self._llms[temperature]
+
+    @staticmethod
+    def augment_prompt(prompt: str, previous: Optional[str], feedback: Optional[str]) -> str:
+        parts = [prompt]
+        if previous:
+            parts.append(f"上一版结果：\n{previous}")
+        if feedback:
+            parts.append(f"改进要求：{feedback}")
+        return "\n\n".join(parts)
+
+    def generate(self, prompt: str, previous: Optional[str] = None, feedback: Optional[str] = None) -> Optional[str]:
+        """返回生成文本；策略为stop且检测到确定性重复时返回None"""
+        memo = self._memo.get()
+        if memo is None:
+            raise RuntimeError("RefinementGuard.generate需要在guard.run()中调用")
+        self.metrics["calls"] += 1
+        llm = self.llm
+        temperature = getattr(llm, "temperature", None)
+        key = (prompt, temperature)
+
+        if key in memo.cache and self.is_deterministic(temperature) and self.policy != "none":
+            self.metrics["repeated_deterministic"] += 1
+            if self.policy == "cache":
+                self.metrics["cache_hits"] += 1
+                memo.cache.move_to_end(key)
+                return memo.cache[key]
+            if self.policy == "stop":
+                self.metrics["early_stops"] += 1
+                return None
+            # perturb：拼接反馈并逐级提高温度
+            memo.perturb_level += 1
+            temperature = min(self.max_temperature, self.temperature_step * memo.perturb_level)
+            prompt = self.augment_prompt(prompt, previous, feedback)
+            llm = self._llm_at(temperature)
+            key = (prompt, temperature)
+            self.metrics["perturbed"] += 1
+
+        text = llm.invoke(prompt).content
+        self.metrics["llm_calls"] += 1
+        if memo.cache.get(key) == text:
+            self.metrics["wasted_identical"] += 1
+        memo.cache[key] = text
+        memo.cache.move_to_end(key)
+        while len(memo.cache) > self.max_cache:
+            memo.cache.popitem(last=False)
+        return text
+
+    def report(self) -> str:
+        return ", ".join(f"{k}={v}" for k, v in self.metrics.items())
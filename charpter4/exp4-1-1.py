@@ -0,0 +1,65 @@
+from langgraph.graph import StateGraph, END
+from langchain_core.prompts import PromptTemplate
+from langchain_ollama import ChatOllama
+from typing import TypedDict, Optional
+from pydantic import BaseModel
+from partial_json import PartialJsonExtractor
+
+# 定义Pydantic结构，用于解析与校验LLM输出内容
+class ParserOutput(BaseModel):
+    title: str
+    summary: str
+
+# 定义工作流状态结构，承载用户输入与解析后字段
+class ParseState(TypedDict):
+    user_input: str
+    title: Optional[str]
+    summary: Optional[str]
+
+# 初始化语言模型
+llm = ChatOllama(model="qwen3:8b", temperature=0, base_url="http://127.0.0.1:11434")
+
+# 构建Prompt模板，要求输出为JSON结构
+prompt = PromptTemplate.from_template(
+    "请根据以下内容提取标题和摘要，并以JSON格式返回：\n输出格式示例：{{\"title\": ..., \"summary\": ...}}:\n\n{text}"
+)
+chain = prompt | llm  # 不再使用JsonOutputParser，由提取器在流式输出上增量解析
+
+# 节点函数：边生成边解析，字段就绪后立即可用，全部字段齐全后停止生成
+def llm_parse_node(state: ParseState) -> ParseState:
+    extractor = PartialJsonExtractor(ParserOutput)
+    for chunk in chain.stream({"text": state["user_input"]}):
+        for name, value in extractor.feed(chunk.content):
+            print(f"[字段完成] {name}: {value}")
+        if extractor.satisfied:
+            break  # 跳出循环即关闭流，不再等待模型输出剩余内容
+    else:
+        extractor.finish()  # 模型输出结束，补全可能缺失的引号或括号
+    if extractor.repairs:
+        print("本地修复：", extractor.repairs)
+    obj = extractor.result()  # 使用Pydantic进行最终校验
+    return {
+        "user_input": state["user_input"],
+        "title": obj.title,
+        "summary": obj.summary
+    }
+
+# 构建LangGraph流程
+builder = StateGraph(ParseState)
+builder.add_node("parse", llm_parse_node)
+builder.add_edge("parse", END)
+builder.set_entry_point("parse")
+graph = builder.compile()
+
+# 初始输入状态
+initial_state = {
+    "user_input": "请提取以下文本的标题和摘要：\n人工智能正在改变世界。它在医疗、教育、交通等领域带来了巨大的变革。未来，AI将继续推动社会进步。",
+    "title": None,
+    "summary": None
+}
+
+# 执行流程
+final_state = graph.invoke(initial_state)
+print("解析结果：")
+print(f"标题：{final_state['title']}")
+print(f"摘要：{final_state['summary']}")
@@ -0,0 +1,65 @@
+from langgraph.graph import StateGraph, END
+from langchain_core.runnables import RunnableConfig
+from typing import TypedDict, Optional
+from langchain_ollama import ChatOllama
+from stream_channel import stream_hub, with_stream_hub
+import asyncio
+import time
+
+# 定义工作流状态结构
+class PipelineState(TypedDict):
+    user_input: str
+    stream_output: Optional[str]
+    translation: Optional[str]
+
+# 初始化语言模型
+llm = ChatOllama(model="qwen3:8b", temperature=0, base_url="http://127.0.0.1:11434", streaming=True)
+
+# 上游节点：流式生成摘要，每段输出立即写入summary通道
+async def llm_stream_node(state: PipelineState, config: RunnableConfig) -> dict:
+    prompt = f"请根据以下内容生成摘要：\n{state['user_input']}"
+    buffer = []
+    async with stream_hub(config).writer("summary") as channel:
+        async for chunk in llm.astream(prompt):
+            if chunk.content:
+                buffer.append(chunk.content)
+                await channel.send(chunk.content)
+    print(f"[{time.perf_counter() - start:.2f}s] 摘要生成完成")
+    return {"stream_output": "".join(buffer)}
+
+# 下游节点：与上游并发执行，每读到一个完整句子就开始翻译，不等待整段摘要生成完毕
+async def translate_node(state: PipelineState, config: RunnableConfig) -> dict:
+    translated = []
+    async for sentence in stream_hub(config).channel("summary").sentences():
+        result = await llm.ainvoke(f"将下面的句子翻译为英文，只输出译文：\n{sentence}")
+        print(f"[{time.perf_counter() - start:.2f}s] 译文：{result.content}")
+        translated.append(result.content)
+    return {"translation": " ".join(translated)}
+
+# 构建LangGraph流程：两个节点从入口同时启动，在同一步中并发执行
+builder = StateGraph(PipelineState)
+builder.add_node("start", lambda state: {})
+builder.add_node("stream", llm_stream_node)
+builder.add_node("translate", translate_node)
+builder.set_entry_point("start")
+builder.add_edge("start", "stream")
+builder.add_edge("start", "translate")
+builder.add_edge(["stream", "translate"], END)
+graph = builder.compile()
+
+async def main():
+    global start
+    initial_state = {
+        "user_input": "LangChain与LangGraph联合使用可以实现多节点、状态驱动的语言模型智能体工作流，适用于复杂任务的分布式调度与工具链管理。",
+        "stream_output": None,
+        "translation": None
+    }
+    start = time.perf_counter()
+    # 每次运行使用独立的通道集合
+    final_state = await graph.ainvoke(initial_state, with_stream_hub())
+    print(f"总耗时：{time.perf_counter() - start:.2f}s")
+    print("摘要：", final_state["stream_output"])
+    print("译文：", final_state["translation"])
+
+start = time.perf_counter()
+asyncio.run(main())
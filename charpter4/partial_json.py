@@ -0,0 +1,279 @@
+import ast
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+_THINK_OPEN, _THINK_CLOSE = "<think>", "</think>"
+_PY_LITERALS = re.compile(r"\b(true|false|null)\b")
+_BARE_KEY = re.compile(r"[A-Za-z_][\w-]*")
+
+
+def _literal_eval(text: str) -> Any:
+    """按Python字面量解析，兼容JSON的true/false/null"""
+    return ast.literal_eval(_PY_LITERALS.sub(lambda m: {"true": "True", "false": "False",
+                                                        "null": "None"}[m.group(1)], text))
+
+
+def _split_member(text: str) -> Tuple[str, Optional[str]]:
+    """按引号外的第一个冒号拆分 key: value"""
+    quote, escape = None, False
+    for i, c in enumerate(text):
+        if quote:
+            if escape:
+                escape = False
+            elif c == "\\":
+                escape = True
+            elif c == quote:
+                quote = None
+        elif c in "\"'":
+            quote = c
+        elif c == ":":
+            return text[:i].strip(), text[i + 1:].strip()
+    return text.strip(), None
+
+
+class PartialJsonExtractor:
+    """流式、容错的JSON字段提取器：随token到达增量解析，字段一完整就校验并产出。
+
+    - 跳过<think>...</think>思考内容、JSON前后的说明文字与```代码块标记；
+      说明文字中未配对的"{"被误当作对象开始时，在下一个对象处重新同步
+    - 本地修复常见格式问题：单引号、未加引号的键或值、多余或缺少的逗号、true/True混用、
+      字符串中的原始换行、流结束时缺少的引号与右括号；修复记录在repairs中
+    - 只保留schema中声明的字段，satisfied为True时所有必填字段均已就绪，可提前停止生成
+    """
+
+    def __init__(self, model: Type[BaseModel]):
+        self.model = model
+        self._adapters = {name: TypeAdapter(f.annotation) for name, f in model.model_fields.items()}
+        self._required = {name for name, f in model.model_fields.items() if f.is_required()}
+        self.fields: Dict[str, Any] = {}
+        self.repairs: List[str] = []
+        self.done = False
+        self._final = False  # 流已结束，不再等待后续文本
+        self._pre = ""  # 对象开始前的文本
+        self._buf: Optional[str] = None  # 当前对象文本，从"{"开始
+        self._reset_scanner()
+
+    def _reset_scanner(self) -> None:
+        self._pos = 1
+        self._depth = 1
+        self._quote: Optional[str] = None
+        self._escape = False
+        self._last = "{"  # 字符串外最近的非空白字符
+        self._member_start = 1
+        self._colon: Optional[int] = None  # 当前成员中第一层冒号的位置
+
+    @property
+    def satisfied(self) -> bool:
+        return self._required <= self.fields.keys()
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        """输入一段新文本，返回本次新完成的(字段名, 值)"""
+        if self.done or not text:
+            return []
+        if self._buf is None:
+            self._pre += text
+            if not self._start_object():
+                return []
+        else:
+            self._buf += text
+        return self._scan()
+
+    def finish(self) -> List[Tuple[str, Any]]:
+        """流结束时调用：补全未闭合的字符串与对象，解析最后一个字段"""
+        if self.done or self._buf is None:
+            self.done = True
+            return []
+        self._final = True
+        emitted = self._scan()  # 扫描此前为等待后续文本而暂停的部分
+        if self.done or self._buf is None:
+            self.done = True
+            return emitted
+        if self._quote:
+            self._buf += self._quote
+            self.repairs.append("unterminated_string")
+        if self._depth > 1:
+            self.repairs.append("unclosed_nested")
+        self.repairs.append("missing_closing_brace")
+        emitted += self._member(self._buf[self._member_start:])
+        self.done = True
+        return emitted
+
+    def result(self) -> BaseModel:
+        return self.model.model_validate(self.fields)
+
+    def _start_object(self) -> bool:
+        while True:
+            pre = self._pre
+            think, brace = pre.find(_THINK_OPEN), pre.find("{")
+            if think != -1 and (brace == -1 or think < brace):
+                close = pre.find(_THINK_CLOSE, think)
+                if close == -1:
+                    return False  # 仍在思考内容中
+                self._pre = pre[:think] + pre[close + len(_THINK_CLOSE):]
+                continue
+            if brace == -1:
+                self._pre = pre[-len(_THINK_OPEN):]  # 只保留可能被截断的"<think"
+                return False
+            self._buf, self._pre = pre[brace:], ""
+            self._reset_scanner()
+            return True
+
+    def _scan(self) -> List[Tuple[str, Any]]:
+        emitted: List[Tuple[str, Any]] = []
+        buf, i = self._buf, self._pos
+        while i < len(buf):
+            c = buf[i]
+            in_string = self._quote is not None
+            if not in_string and self._depth == 1:
+                boundary = self._missing_comma(buf, i)
+                if boundary is None:
+                    break  # 等待后续文本再判断是否省略了逗号
+                if boundary:
+                    # 完整的值之后直接出现下一个"键:"，视为省略了逗号
+                    emitted += self._member(buf[self._member_start:i])
+                    self._member_start, self._colon, self._last = i, None, ","
+                    self.repairs.append("missing_comma")
+            if in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == self._quote:
+                    self._quote = None
+            elif c == '"' or (c == "'" and self._last in "{[,:"):
+                self._quote = c
+            elif c == "{" and self._depth == 1 and not self.fields and self._not_a_member(buf[self._member_start:i]):
+                # 当前"对象"实为说明文字（如"用{花括号：{...}"），从这个"{"重新开始解析
+                self._buf, self._pre = None, buf[i:]
+                self._start_object()
+                return emitted + self._scan()
+            elif c in "{[":
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    emitted += self._member(buf[self._member_start:i])
+                    return emitted + self._end_object(i)
+            elif c == "," and self._depth == 1:
+                emitted += self._member(buf[self._member_start:i])
+                self._member_start, self._colon = i + 1, None
+            elif c == ":" and self._depth == 1 and self._colon is None:
+                self._colon = i
+            if (not in_string and not c.isspace()) or (in_string and self._quote is None):
+                self._last = c
+            i += 1
+        self._pos = i
+        return emitted
+
+    def _missing_comma(self, buf: str, i: int) -> Optional[bool]:
+        """当前成员的值已经完整（字符串、数组/对象或数字等字面量），且buf[i:]以"键:"开头；
+        需要更多文本才能判断时返回None"""
+        c = buf[i]
+        if self._colon is None or not (c in "\"'" or c == "_" or c.isalpha()):
+            return False
+        value = buf[self._colon + 1:i].strip()
+        if self._last not in "\"'}]":
+            # 数字与true/false/null之后需有空白，且都很短，避免对长的未加引号文本反复尝试解析
+            if not buf[i - 1].isspace() or len(value) > 32:
+                return False
+        if not value:
+            return False
+        follows = self._key_follows(buf, i)
+        if not follows:
+            return follows
+        try:
+            json.loads(value, strict=False)
+            return True
+        except ValueError:
+            pass
+        try:
+            _literal_eval(value)
+            return True
+        except (ValueError, SyntaxError):
+            return False
+
+    def _key_follows(self, buf: str, i: int) -> Optional[bool]:
+        """buf[i:]是否为"键:"的形式；流未结束且文本不足以判断时返回None"""
+        if buf[i] in "\"'":
+            j, escape = i + 1, False
+            while j < len(buf):
+                if escape:
+                    escape = False
+                elif buf[j] == "\\":
+                    escape = True
+                elif buf[j] == buf[i]:
+                    break
+                j += 1
+            j += 1
+        else:
+            j = _BARE_KEY.match(buf, i).end()
+        while j < len(buf) and buf[j].isspace():
+            j += 1
+        if j >= len(buf):
+            return False if self._final else None
+        return buf[j] == ":"
+
+    @staticmethod
+    def _not_a_member(text: str) -> bool:
+        """嵌套对象之前的文本不是"键:"的形式，说明外层的"{"并非JSON对象的开始"""
+        key_text, value_text = _split_member(text)
+        if value_text is None or value_text:
+            return True
+        return not key_text or (key_text[0] not in "\"'" and not _BARE_KEY.fullmatch(key_text))
+
+    def _end_object(self, end: int) -> List[Tuple[str, Any]]:
+        rest = self._buf[end + 1:]
+        if self.fields:
+            self.done = True
+            return []
+        # 该对象中没有任何有效字段（例如说明文字中的花括号），继续寻找下一个对象
+        self._buf, self._pre = None, rest
+        if self._start_object():
+            return self._scan()
+        return []
+
+    def _member(self, text: str) -> List[Tuple[str, Any]]:
+        text = text.strip()
+        if not text:
+            if self.fields:
+                self.repairs.append("trailing_comma")
+            return []
+        key_text, value_text = _split_member(text)
+        if value_text is None:
+            return []
+        key = self._load_key(key_text)
+        if key not in self._adapters or key in self.fields:
+            return []
+        try:
+            value = self._adapters[key].validate_python(self._load_value(value_text))
+        except ValidationError:
+            self.repairs.append(f"invalid:{key}")
+            return []
+        self.fields[key] = value
+        return [(key, value)]
+
+    def _load_key(self, text: str) -> str:
+        if text and text[0] in "\"'":
+            try:
+                return str(ast.literal_eval(text)) if text[0] == "'" else json.loads(text)
+            except (ValueError, SyntaxError):
+                pass
+        self.repairs.append("unquoted_key")
+        return text.strip("\"' ")
+
+    def _load_value(self, text: str) -> Any:
+        try:
+            return json.loads(text, strict=False)  # strict=False允许字符串中的原始换行
+        except ValueError:
+            pass
+        try:
+            value = _literal_eval(text)
+            self.repairs.append("python_literal")
+            return value
+        except (ValueError, SyntaxError):
+            pass
+        self.repairs.append("unquoted_value")
+        return text.strip("\"'")
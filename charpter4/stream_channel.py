@@ -0,0 +1,131 @@
+import asyncio
+import re
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+
+from langchain_core.runnables import RunnableConfig
+
+# 句子结束标点：中英文句号、问号、感叹号、分号与换行
+_SENTENCE_END = re.compile(r"[。！？；!?;\n]|\.(?=\s)")
+# 读取方等待上游开始写入的默认时长（秒）
+DEFAULT_OPEN_TIMEOUT = 10.0
+
+
+class StreamChannel:
+    """节点之间的流式文本通道：上游逐段写入，下游边生成边读取。
+
+    写入的内容全部保留，可以有多个读取方，每个读取方都从头读到尾；
+    上游异常结束时读取方会收到同一个异常，不会一直等待。
+    上游必须与读取方在同一超步中运行（或更早运行）：读取方等待open_timeout秒仍未见上游开始写入时报错，
+    避免上游被安排在后续超步、读取方所在的超步永远无法结束。
+    """
+
+    def __init__(self, name: str, open_timeout: Optional[float] = DEFAULT_OPEN_TIMEOUT):
+        self.name = name
+        self.open_timeout = open_timeout
+        self._chunks: List[str] = []
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self._changed = asyncio.Condition()
+        self._opened = asyncio.Event()
+
+    def open(self) -> None:
+        """标记上游已开始写入"""
+        self._opened.set()
+
+    async def send(self, text: str) -> None:
+        if self._closed:
+            raise RuntimeError(f"通道{self.name}已关闭")
+        self._opened.set()
+        if text:
+            async with self._changed:
+                self._chunks.append(text)
+                self._changed.notify_all()
+
+    async def close(self, error: Optional[BaseException] = None) -> None:
+        self._opened.set()
+        async with self._changed:
+            self._closed = True
+            self._error = error
+            self._changed.notify_all()
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        if not self._opened.is_set():
+            try:
+                await asyncio.wait_for(self._opened.wait(), self.open_timeout)
+            except asyncio.TimeoutError:
+                raise RuntimeError(f"等待{self.open_timeout}s后通道{self.name}仍无写入方：写入节点须与读取节点"
+                                   f"在同一超步中运行（从同一节点并行分出），而不能排在读取节点之后") from None
+        index = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: index < len(self._chunks) or self._closed)
+                chunks = self._chunks[index:]
+                closed, error = self._closed, self._error
+            index += len(chunks)
+            for chunk in chunks:
+                yield chunk
+            if closed and index >= len(self._chunks):
+                if error is not None:
+                    raise error
+                return
+
+    async def sentences(self) -> AsyncIterator[str]:
+        """按句读取：每凑齐一个完整句子就产出，结束时产出剩余文本"""
+        pending = ""
+        async for chunk in self:
+            pending += chunk
+            start = 0
+            for match in _SENTENCE_END.finditer(pending):
+                sentence = pending[start:match.end()].strip()
+                start = match.end()
+                if sentence:
+                    yield sentence
+            pending = pending[start:]
+        if pending.strip():
+            yield pending.strip()
+
+    async def text(self) -> str:
+        """等待上游结束并返回完整文本"""
+        return "".join([chunk async for chunk in self])
+
+
+class StreamHub:
+    """一次运行内的全部流式通道，按名称创建与获取"""
+
+    def __init__(self, open_timeout: Optional[float] = DEFAULT_OPEN_TIMEOUT) -> None:
+        self.open_timeout = open_timeout
+        self._channels: Dict[str, StreamChannel] = {}
+
+    def channel(self, name: str) -> StreamChannel:
+        if name not in self._channels:
+            self._channels[name] = StreamChannel(name, self.open_timeout)
+        return self._channels[name]
+
+    @asynccontextmanager
+    async def writer(self, name: str) -> AsyncIterator[StreamChannel]:
+        """上游节点使用：退出时关闭通道，出现异常时把异常传给读取方"""
+        channel = self.channel(name)
+        channel.open()
+        try:
+            yield channel
+        except BaseException as e:
+            await channel.close(e)
+            raise
+        await channel.close()
+
+
+def with_stream_hub(config: Optional[RunnableConfig] = None,
+                    open_timeout: Optional[float] = DEFAULT_OPEN_TIMEOUT) -> RunnableConfig:
+    """为一次运行创建新的通道集合，通过config["configurable"]传给各节点"""
+    config = dict(config or {})
+    config["configurable"] = {**config.get("configurable", {}), "stream_hub": StreamHub(open_timeout)}
+    return config
+
+
+def stream_hub(config: RunnableConfig) -> StreamHub:
+    """在节点中获取本次运行的通道集合"""
+    hub = config.get("configurable", {}).get("stream_hub")
+    if hub is None:
+        raise RuntimeError("运行配置中缺少stream_hub，请使用with_stream_hub(config)启动运行")
+    return hub
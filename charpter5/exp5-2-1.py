@@ -0,0 +1,74 @@
+from langgraph.graph import StateGraph, END
+from typing import TypedDict, List, Optional, Annotated
+from map_node import map_node
+import asyncio
+import operator
+import random
+
+import logging
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+# 定义状态结构：分块结果与错误列表通过reducer合并
+class MapState(TypedDict):
+    input: str
+    chunks: List[str]
+    summaries: Annotated[List[Optional[str]], operator.add]
+    keywords: Annotated[List[Optional[str]], operator.add]
+    errors: Annotated[List[dict], operator.add]
+    merged: Optional[str]
+
+# 将长文本切分为若干块，块数由输入决定
+def split_chunks(state: MapState) -> MapState:
+    sentences = [s for s in state["input"].split("。") if s.strip()]
+    logging.info(f"切分为{len(sentences)}个文本块")
+    return {"chunks": sentences}
+
+# 单块任务1：提取摘要
+async def summarize_chunk(chunk: str) -> str:
+    await asyncio.sleep(random.uniform(0.2, 1.0))  # 模拟处理时间
+    if random.random() < 0.1:
+        raise RuntimeError("模型调用失败")
+    return f"摘要：{chunk[:10]}..."
+
+# 单块任务2：提取关键词
+def extract_chunk_keywords(chunk: str) -> str:
+    words = [w.strip(".,!?，") for w in chunk.lower().split()]  # 简单示例
+    return ",".join(words[:5])
+
+# 合并节点：按原始顺序拼接各块结果，失败块跳过
+def merge_results(state: MapState) -> MapState:
+    lines = []
+    for i, (summary, keywords) in enumerate(zip(state["summaries"], state["keywords"])):
+        if summary is not None:
+            lines.append(f"[{i}] Summary: {summary} | Keywords: {keywords}")
+    logging.info(f"合并完成，失败块数：{len(state['errors'])}")
+    return {"merged": "\n".join(lines)}
+
+# 构建状态图
+graph = StateGraph(MapState)
+graph.add_node("split", split_chunks)
+graph.add_node("summarize", map_node(summarize_chunk, "chunks", "summaries",
+                                     max_concurrency=4, timeout=0.8, errors_key="errors"))
+graph.add_node("extract_keywords", map_node(extract_chunk_keywords, "chunks", "keywords",
+                                            max_concurrency=4, errors_key="errors"))
+graph.add_node("merge", merge_results)
+
+graph.set_entry_point("split")
+graph.add_edge("split", "summarize")
+graph.add_edge("split", "extract_keywords")
+graph.add_edge(["summarize", "extract_keywords"], "merge")  # 两个分支都完成后进入merge
+graph.add_edge("merge", END)
+
+compiled = graph.compile()
+
+# 执行图
+input_data = {"input": "。".join(f"这是第{i}段用于测试动态扇出的示例文本，包含多个句子和关键词" for i in range(20))}
+result = asyncio.run(compiled.ainvoke(input_data))
+
+print("合并结果：")
+print(result["merged"])
+print("失败记录：", result["errors"])
@@ -0,0 +1,66 @@
+from langgraph.graph import StateGraph, END
+from typing import TypedDict, Optional
+from collections import Counter
+from process_node import process_node, warm_up_pool, shutdown_pool
+import time
+
+# 定义状态结构
+class ParallelState(TypedDict):
+    input: str
+    keywords: Optional[str]
+    bigrams: Optional[str]
+    merged: Optional[str]
+
+# CPU密集任务1：统计高频关键词（纯Python，受GIL限制）
+# process节点的函数需定义在模块顶层，才能被发送到子进程执行
+def extract_keywords(state: dict) -> dict:
+    counter = Counter()
+    for _ in range(30):  # 重复统计，模拟较重的计算量
+        counter.update(w.strip('.,!?') for w in state["input"].lower().split() if len(w) > 3)
+    return {"keywords": ",".join(w for w, _ in counter.most_common(5))}
+
+# CPU密集任务2：统计高频二元词组
+def extract_bigrams(state: dict) -> dict:
+    counter = Counter()
+    words = state["input"].lower().split()
+    for _ in range(30):
+        counter.update(zip(words, words[1:]))
+    return {"bigrams": ",".join(" ".join(pair) for pair, _ in counter.most_common(5))}
+
+# 同步屏障节点：合并两个分支结果
+def merge_results(state: ParallelState) -> ParallelState:
+    return {"merged": f"Keywords: {state['keywords']} | Bigrams: {state['bigrams']}"}
+
+# 构建状态图，use_processes决定CPU节点是否在进程池中执行
+def build_graph(use_processes: bool):
+    graph = StateGraph(ParallelState)
+    if use_processes:
+        graph.add_node("extract_keywords", process_node(extract_keywords, input_keys=["input"]))
+        graph.add_node("extract_bigrams", process_node(extract_bigrams, input_keys=["input"]))
+    else:
+        graph.add_node("extract_keywords", extract_keywords)
+        graph.add_node("extract_bigrams", extract_bigrams)
+    graph.add_node("merge", merge_results)
+    graph.add_node("start", lambda state: state)
+    graph.set_entry_point("start")
+    graph.add_edge("start", "extract_keywords")
+    graph.add_edge("start", "extract_bigrams")
+    graph.add_edge(["extract_keywords", "extract_bigrams"], "merge")
+    graph.add_edge("merge", END)
+    return graph.compile()
+
+# 子进程会重新导入本模块，执行逻辑必须放在main保护内
+if __name__ == "__main__":
+    input_data = {"input": "LangGraph builds stateful workflows with parallel branches and shared state. " * 20000}
+
+    print("预热进程数：", warm_up_pool())
+
+    for use_processes in (False, True):
+        compiled = build_graph(use_processes)
+        start = time.perf_counter()
+        result = compiled.invoke(input_data)
+        elapsed = time.perf_counter() - start
+        print(f"{'进程池' if use_processes else '线程（GIL）'}执行耗时：{elapsed:.2f}s")
+
+    print("最终结果：", result["merged"])
+    shutdown_pool()
@@ -0,0 +1,71 @@
+from langgraph.graph import StateGraph, END
+from typing import TypedDict, Optional
+from join_node import add_join
+import threading
+import time
+
+# 同步分支卡死时的汇合：超时分支在独立线程中运行，不会拖垮其他分支和其他图
+
+class JoinState(TypedDict):
+    input: str
+    a: Optional[str]
+    b: Optional[str]
+    merged: Optional[str]
+
+hang = threading.Event()
+
+def slow_branch(state: JoinState) -> JoinState:
+    hang.wait(30)  # 模拟卡死的同步调用
+    return {"a": "A"}
+
+def fast_branch(state: JoinState) -> JoinState:
+    return {"b": "B"}
+
+def none_branch(state: JoinState) -> JoinState:
+    return {"a": None}  # 正常完成但结果为None，不应视为缺失
+
+def merge(state: JoinState) -> JoinState:
+    return {"merged": f"{state['a'] or 'MISSING'}|{state['b'] or 'MISSING'}"}
+
+def build(branch_a, timeout):
+    graph = StateGraph(JoinState)
+    graph.add_node("start", lambda state: state)
+    graph.add_node("a", branch_a)
+    graph.add_node("b", fast_branch)
+    graph.set_entry_point("start")
+    graph.add_edge("start", "a")
+    graph.add_edge("start", "b")
+    add_join(graph, "merge", merge, branches={"a": ["a"], "b": ["b"]},
+             timeout=timeout, on_missing="fill")
+    graph.add_edge("merge", END)
+    return graph
+
+hung = build(slow_branch, 0.3).compile()
+for i in range(10):  # 超过默认线程池大小的卡死次数
+    start = time.perf_counter()
+    result = hung.invoke({"input": "x"})
+    print(f"第{i + 1}次（分支a卡死）：{result['merged']}，耗时{time.perf_counter() - start:.2f}s")
+    assert result["merged"] == "MISSING|B"
+
+healthy = build(lambda state: {"a": "A"}, 0.3).compile()
+result = healthy.invoke({"input": "x"})
+print("其他图不受影响：", result["merged"])
+assert result["merged"] == "A|B" and "_join_merge_finished" not in result
+
+# 分支写入None不视为缺失：on_missing="fail"时也不会报错
+graph = StateGraph(JoinState)
+graph.add_node("a", none_branch)
+graph.add_node("b", fast_branch)
+graph.set_entry_point("a")
+graph.add_edge("a", "b")
+add_join(graph, "merge", merge, branches={"a": ["a"], "b": ["b"]}, on_missing="fail")
+print("分支写入None：", graph.compile().invoke({"input": "x"})["merged"])
+
+# 同一分支不能被两个汇合节点重复包装
+graph = build(fast_branch, None)
+try:
+    add_join(graph, "merge2", merge, branches={"a": ["a"]})
+except ValueError as e:
+    print("重复包装被拒绝：", e)
+
+hang.set()  # 释放后台仍在运行的卡死线程
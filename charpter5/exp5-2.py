@@ -1,5 +1,6 @@
 from langgraph.graph import StateGraph, END
 from typing import TypedDict, Optional
+from join_node import add_join
 import asyncio
 
 import logging
@@ -33,10 +34,8 @@ async def extract_keywords(state: ParallelState) -> ParallelState:
     logging.info("提取关键词任务结束执行")
     return {"keywords":",".join(words[:5])}
 
-# 同步屏障节点：合并摘要与关键词
+# 同步屏障节点：合并摘要与关键词（由汇合节点保证两个分支均已完成）
 def merge_results(state: ParallelState) -> ParallelState:
-    if "summary" not in state or "keywords" not in state:
-        return {}  # 还没齐，先不更新 merged
     combined = f"Summary: {state['summary']} | Keywords: {state['keywords']}"
     return {"merged": combined}
 
@@ -44,7 +43,6 @@ def merge_results(state: ParallelState) -> ParallelState:
 graph = StateGraph(ParallelState)
 graph.add_node("summarize", summarize)
 graph.add_node("extract_keywords", extract_keywords)
-graph.add_node("merge", merge_results)
 
 # 设置并发路径入口
 # graph.set_entry_point("summarize")
@@ -56,8 +54,15 @@ graph.add_node("start", lambda state: state)  # 起始节点
 graph.add_edge("start", "summarize")
 graph.add_edge("start", "extract_keywords")
 
-graph.add_edge("summarize", "merge")  # summarize完成后进入merge
-graph.add_edge("extract_keywords", "merge")  # extract_keywords完成后进入merge
+# 汇合节点：summarize与extract_keywords都完成后只触发一次merge，超时分支结果补为None
+add_join(
+    graph,
+    "merge",
+    merge_results,
+    branches={"summarize": ["summary"], "extract_keywords": ["keywords"]},
+    timeout=5,
+    on_missing="fill",
+)
 
 graph.set_entry_point("start")
 graph.add_edge("merge", END)  # merge完成后流程结束
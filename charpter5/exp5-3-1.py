@@ -0,0 +1,92 @@
+from langgraph.graph import StateGraph, END
+from langchain_core.runnables import RunnableLambda
+from typing import TypedDict
+from subgraph_inline import compile_graph
+import time
+
+# ========== 形态1：exp5-3，主图中嵌入一个预处理子图 ==========
+class GlobalState(TypedDict):
+    input: str
+    preprocessed: str
+    analyzed: str
+    result: str
+
+class SubState(TypedDict):
+    input: str
+    preprocessed: str
+
+def clean_text(state: SubState) -> SubState:
+    return {**state, "preprocessed": state["input"].strip().lower()}
+
+def analyze(state: GlobalState) -> GlobalState:
+    text = state["preprocessed"]
+    return {**state, "analyzed": f"分析结果：文本长度为{len(text)}, 开始：{text[:5]}..."}
+
+def finalize(state: GlobalState) -> GlobalState:
+    return {**state, "result": f"分析完成：{state['analyzed']}"}
+
+def build_subflow_graph() -> StateGraph:
+    subgraph = StateGraph(SubState)
+    subgraph.add_node("clean_text", clean_text)
+    subgraph.set_entry_point("clean_text")
+    subgraph.add_edge("clean_text", END)
+
+    main_graph = StateGraph(GlobalState)
+    main_graph.add_node("subgraph", subgraph.compile())
+    main_graph.add_node("analyze", analyze)
+    main_graph.add_node("finalize", finalize)
+    main_graph.set_entry_point("subgraph")
+    main_graph.add_edge("subgraph", "analyze")
+    main_graph.add_edge("analyze", "finalize")
+    main_graph.add_edge("finalize", END)
+    return main_graph
+
+# ========== 形态2：exp8-6，每个插件编译为一个子图并串联 ==========
+class WorkflowState(TypedDict):
+    input: str
+    output: str
+
+def create_plugin_graph(name: str) -> StateGraph:
+    graph = StateGraph(WorkflowState)
+
+    def plugin_func(state: WorkflowState) -> WorkflowState:
+        result = f"[插件{name}]处理输入：{state['input']}"
+        new_output = f"{state['output']}\n -> {result}" if state["output"] else result
+        return {"input": state["input"], "output": new_output}
+
+    graph.add_node("plugin_node", RunnableLambda(plugin_func))
+    graph.set_entry_point("plugin_node")
+    graph.set_finish_point("plugin_node")
+    return graph
+
+def build_plugin_graph(plugin_names) -> StateGraph:
+    graph = StateGraph(WorkflowState)
+    graph.add_node("preprocess", RunnableLambda(lambda state: {"input": state["input"], "output": ""}))
+    for name in plugin_names:
+        graph.add_node(name, create_plugin_graph(name).compile())
+    graph.add_node("postprocess", RunnableLambda(lambda state: {"input": state["input"], "output": f"最终输出:{state['output']}"}))
+    graph.set_entry_point("preprocess")
+    previous = "preprocess"
+    for name in plugin_names:
+        graph.add_edge(previous, name)
+        previous = name
+    graph.add_edge(previous, "postprocess")
+    graph.set_finish_point("postprocess")
+    return graph
+
+# 基准测试：分别测量子图原样嵌入与展开后的单次调用耗时
+def benchmark(title: str, builder: StateGraph, inputs: dict, rounds: int = 500):
+    print(f"== {title} ==")
+    results = {}
+    for inline in (False, True):
+        app = compile_graph(builder, inline=inline)
+        app.invoke(inputs)  # 预热
+        start = time.perf_counter()
+        for _ in range(rounds):
+            results[inline] = app.invoke(inputs)
+        per_call = (time.perf_counter() - start) / rounds * 1e6
+        print(f"{'展开子图' if inline else '嵌套子图'}：{per_call:.0f} µs/次，节点：{list(app.nodes)}")
+    assert results[False] == results[True], "展开前后结果不一致"
+
+benchmark("exp5-3 子流程", build_subflow_graph(), {"input": "  Hello LangGraph Subflow!   "})
+benchmark("exp8-6 插件链", build_plugin_graph(["plugin_math", "plugin_translate"]), {"input": "42"})
@@ -0,0 +1,138 @@
+import asyncio
+import contextvars
+import dataclasses
+import logging
+import threading
+from typing import Annotated, Any, Callable, Dict, List, Literal, Optional, Sequence, TypedDict, get_type_hints
+
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
+from langgraph.graph import StateGraph
+
+# 分支缺失时的处理策略：
+# fail - 抛出JoinMissingError
+# fill - 用fill_value补齐缺失字段后照常合并
+# skip - 不执行合并函数，不产生任何更新
+MissingPolicy = Literal["fail", "fill", "skip"]
+
+
+class JoinMissingError(RuntimeError):
+    pass
+
+
+def _finished(left: List[str], right: Optional[List[str]]) -> List[str]:
+    # 分支完成标记的归约函数：分支追加自身名称，汇合节点写入None清空，供下一轮使用
+    return [] if right is None else left + right
+
+
+def _marker_key(name: str) -> str:
+    return f"_join_{name}_finished"
+
+
+def _run_in_thread(name: str, runnable: Runnable, state: Dict[str, Any],
+                   config: RunnableConfig, timeout: float) -> Dict[str, Any]:
+    # 每次调用使用独立的守护线程：超时的线程无法被强制终止，会在后台运行到分支函数返回，
+    # 但不会占用共享线程池，其他分支与其他图不受影响。需要及时停止的同步分支应自行实现超时
+    outcome: Dict[str, Any] = {}
+    done = threading.Event()
+
+    def target() -> None:
+        try:
+            outcome["value"] = runnable.invoke(state, config)
+        except BaseException as e:
+            outcome["error"] = e
+        finally:
+            done.set()
+
+    context = contextvars.copy_context()
+    threading.Thread(target=context.run, args=(target,), name=f"join-{name}", daemon=True).start()
+    if not done.wait(timeout):
+        raise TimeoutError
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["value"]
+
+
+def _wrap_branch(name: str, runnable: Runnable, marker: str, timeout: Optional[float]) -> RunnableLambda:
+    # 分支正常完成时写入完成标记；超时则不写入任何字段，由汇合节点按缺失策略处理
+    def mark(update: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        if update is None:
+            update = {}
+        if not isinstance(update, dict):
+            raise TypeError(f"汇合分支{name}需返回dict，实际为{type(update).__name__}")
+        return {**update, marker: [name]}
+
+    def run(state: Dict[str, Any], config: RunnableConfig) -> Dict[str, Any]:
+        if timeout is None:
+            return mark(runnable.invoke(state, config))
+        try:
+            return mark(_run_in_thread(name, runnable, state, config, timeout))
+        except TimeoutError:
+            logging.warning(f"分支{name}超时（{timeout}s），未写入结果")
+            return {}
+
+    async def arun(state: Dict[str, Any], config: RunnableConfig) -> Dict[str, Any]:
+        if timeout is None:
+            return mark(await runnable.ainvoke(state, config))
+        try:
+            return mark(await asyncio.wait_for(runnable.ainvoke(state, config), timeout))
+        except asyncio.TimeoutError:
+            logging.warning(f"分支{name}超时（{timeout}s），未写入结果")
+            return {}
+
+    return RunnableLambda(run, afunc=arun, name=name)
+
+
+def add_join(
+    graph: StateGraph,
+    name: str,
+    merge_func: Callable[[Dict[str, Any]], Dict[str, Any]],
+    branches: Dict[str, Sequence[str]],
+    timeout: Optional[float] = None,
+    on_missing: MissingPolicy = "fail",
+    fill_value: Any = None,
+) -> None:
+    """添加汇合节点：等待branches中声明的全部上游分支完成后恰好触发一次。
+
+    - branches为 分支节点名 -> 该分支写入的状态字段，分支节点需已通过add_node添加
+    - timeout为各分支的最长执行时间（秒），超时的分支视为缺失；同步分支在独立线程中运行，
+      超时后线程仍会运行到分支函数返回，需要及时停止的同步分支应自行实现超时
+    - on_missing决定存在缺失分支时的处理方式，merge_func因此无需再做防御性检查
+    """
+    if on_missing not in ("fail", "fill", "skip"):
+        raise ValueError(f"未知的缺失策略：{on_missing}")
+    marker = _marker_key(name)
+    wrapped = {}
+    for branch in branches:
+        if branch not in graph.nodes:
+            raise ValueError(f"分支节点{branch}尚未添加")
+        spec = graph.nodes[branch]
+        if (spec.metadata or {}).get("join"):
+            raise ValueError(f"分支节点{branch}已属于汇合节点{spec.metadata['join']}")
+        # 生成新的节点定义替换原定义，不修改调用方传入的节点对象
+        wrapped[branch] = dataclasses.replace(
+            spec,
+            runnable=_wrap_branch(branch, spec.runnable, marker, timeout),
+            metadata={**(spec.metadata or {}), "join": name},
+        )
+    graph.nodes.update(wrapped)
+
+    def join(state: Dict[str, Any]) -> Dict[str, Any]:
+        # 以完成标记判断分支是否缺失，分支正常写入的None值不视为缺失
+        finished = set(state.get(marker) or ())
+        state = {k: v for k, v in state.items() if k != marker}
+        missing = {branch: list(keys) for branch, keys in branches.items() if branch not in finished}
+        if missing:
+            if on_missing == "fail":
+                raise JoinMissingError(f"汇合节点{name}缺少分支结果：{missing}")
+            if on_missing == "skip":
+                logging.warning(f"汇合节点{name}缺少分支结果{missing}，跳过合并")
+                return {marker: None}
+            state = {**state, **{k: fill_value for keys in missing.values() for k in keys}}
+        return {**merge_func(state), marker: None}
+
+    # 汇合节点的输入在原状态之外增加完成标记字段，标记字段不出现在图的输出中
+    state_hints = get_type_hints(graph.state_schema, include_extras=True)
+    input_schema = TypedDict(f"{name}JoinInput", {**state_hints, marker: Annotated[List[str], _finished]})
+    graph.add_node(name, join, input_schema=input_schema)
+    # 等待边：所有分支都写入后才触发一次汇合节点
+    graph.add_edge(list(branches), name)
@@ -0,0 +1,70 @@
+import asyncio
+import inspect
+from typing import Any, Callable, Dict, List, Optional
+
+
+def map_node(
+    func: Callable[[Any], Any],
+    items_key: str,
+    results_key: str,
+    max_concurrency: int = 8,
+    timeout: Optional[float] = None,
+    errors_key: Optional[str] = None,
+) -> Callable[[Dict[str, Any]], Any]:
+    """构建动态扇出节点：对state[items_key]中的每个元素执行func，
+    同时运行的分支数不超过max_concurrency，结果按输入顺序写入state[results_key]。
+
+    - func可以是同步或异步函数，同步函数在线程中执行
+    - timeout为单个元素的超时时间（秒）；同步函数超时后线程仍会运行到结束，
+      期间继续占用并发名额，保证同时运行的线程数不超过max_concurrency
+    - 单个元素失败或超时不会中断整体，结果位置填None；
+      若指定errors_key，失败信息以{"key", "index", "error"}列表写入该字段
+    - 返回的是局部更新，由状态中为results_key/errors_key声明的reducer完成合并
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency必须大于0")
+    is_async = inspect.iscoroutinefunction(func)
+
+    async def run_item(item: Any) -> Any:
+        if is_async:
+            if timeout is None:
+                return await func(item)
+            return await asyncio.wait_for(func(item), timeout)
+        task = asyncio.ensure_future(asyncio.to_thread(func, item))
+        if timeout is None:
+            return await task
+        done, _ = await asyncio.wait({task}, timeout=timeout)
+        if done:
+            return task.result()
+        # 线程无法被取消：结果作废，但要等线程真正结束后才释放并发名额
+        try:
+            await asyncio.shield(task)
+        except Exception:
+            pass
+        raise asyncio.TimeoutError
+
+    async def node(state: Dict[str, Any]) -> Dict[str, Any]:
+        items: List[Any] = list(state[items_key])
+        results: List[Any] = [None] * len(items)
+        errors: List[Dict[str, Any]] = []
+        next_index = iter(range(len(items)))
+
+        # 固定数量的worker依次领取元素，避免为海量元素一次性创建协程
+        async def worker() -> None:
+            for index in next_index:
+                try:
+                    results[index] = await run_item(items[index])
+                except asyncio.TimeoutError:
+                    errors.append({"key": results_key, "index": index, "error": f"超时（{timeout}s）"})
+                except Exception as e:
+                    errors.append({"key": results_key, "index": index, "error": f"{type(e).__name__}: {e}"})
+
+        workers = min(max_concurrency, len(items))
+        await asyncio.gather(*(worker() for _ in range(workers)))
+
+        update: Dict[str, Any] = {results_key: results}
+        if errors_key:
+            update[errors_key] = sorted(errors, key=lambda e: e["index"])
+        return update
+
+    return node
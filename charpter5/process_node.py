@@ -0,0 +1,66 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from langchain_core.runnables import RunnableLambda
+
+# 进程内共享的进程池，所有process节点复用同一组worker
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+
+
+def get_process_pool(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """获取共享进程池；进程池已创建时再指定不同的max_workers会报错，需先shutdown_pool()"""
+    global _pool, _pool_workers
+    if _pool is None:
+        _pool_workers = max_workers or os.cpu_count() or 1
+        _pool = ProcessPoolExecutor(max_workers=_pool_workers)
+    elif max_workers is not None and max_workers != _pool_workers:
+        raise ValueError(f"共享进程池已按max_workers={_pool_workers}创建，无法改为{max_workers}")
+    return _pool
+
+
+def _noop(delay: float) -> int:
+    time.sleep(delay)
+    return os.getpid()
+
+
+def warm_up_pool(max_workers: Optional[int] = None) -> int:
+    """预先启动全部worker进程，把进程启动与模块导入开销挪到首个请求之前，返回已启动进程数"""
+    pool = get_process_pool(max_workers)
+    # 同时提交与worker数相同的短任务，迫使进程池启动全部进程
+    pids = set(pool.map(_noop, [0.05] * _pool_workers))
+    return len(pids)
+
+
+def shutdown_pool() -> None:
+    global _pool, _pool_workers
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+        _pool_workers = 0
+
+
+def process_node(func: Callable[[Dict[str, Any]], Dict[str, Any]],
+                 input_keys: Optional[Sequence[str]] = None) -> RunnableLambda:
+    """将CPU密集的纯Python节点标记为process节点，在共享进程池中执行。
+
+    - func必须是模块顶层定义的函数（可被pickle），输入为状态切片，返回局部更新
+    - input_keys指定传入子进程的状态字段，只序列化需要的部分；为None时传入完整状态
+    - 同时支持invoke与ainvoke，并行分支中的多个process节点可同时占用多个CPU核心
+    """
+    def state_slice(state: Dict[str, Any]) -> Dict[str, Any]:
+        if input_keys is None:
+            return dict(state)
+        return {k: state[k] for k in input_keys if k in state}
+
+    def run(state: Dict[str, Any]) -> Dict[str, Any]:
+        return get_process_pool().submit(func, state_slice(state)).result()
+
+    async def arun(state: Dict[str, Any]) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_process_pool(), func, state_slice(state))
+
+    return RunnableLambda(run, afunc=arun, name=func.__name__)
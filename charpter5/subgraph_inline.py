@@ -0,0 +1,129 @@
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from langgraph.channels.last_value import LastValue
+from langgraph.graph import StateGraph, START, END
+from langgraph.graph.state import CompiledStateGraph
+
+
+def _incompatible_reason(parent: StateGraph, node: str, sub: CompiledStateGraph) -> Optional[str]:
+    """判断子图能否展开到父图，可展开时返回None，否则返回原因"""
+    sb = sub.builder
+    if sub.checkpointer not in (None, False):
+        return "子图使用了独立的checkpointer"
+    if sub.interrupt_before_nodes or sub.interrupt_after_nodes:
+        return "子图设置了中断点"
+    if sb.input_schema is not sb.state_schema or sb.output_schema is not sb.state_schema:
+        return "子图声明了独立的输入/输出结构"
+    if sb.managed:
+        return "子图包含托管字段"
+    # 子图节点写入的字段必须是父图中同样为覆盖语义（LastValue）的字段：
+    # 子图作为节点时会写回完整终态，对带reducer的字段展开前后语义不同
+    for key, channel in sb.channels.items():
+        if key not in parent.channels:
+            return f"字段{key}不在父图状态中"
+        if not isinstance(channel, LastValue) or not isinstance(parent.channels[key], LastValue):
+            return f"字段{key}带有reducer"
+    entries = [end for start, end in sb.edges if start == START]
+    if len(entries) != 1 or START in sb.branches or any(START in starts for starts, _ in sb.waiting_edges):
+        return "子图入口不唯一"
+    exits = [start for start, end in sb.edges if end == END]
+    if len(exits) != 1 or any(end == END for _, end in sb.waiting_edges):
+        return "子图出口不唯一"
+    for branches in sb.branches.values():
+        for spec in branches.values():
+            if spec.ends is None or END in spec.ends.values():
+                return "子图条件边可能直接结束"
+    if any(spec.ends for spec in sb.nodes.values()):
+        return "子图节点使用Command跳转"
+    if node in parent.branches:
+        return "父图在该节点后有条件边"
+    return None
+
+
+def inline_subgraphs(builder: StateGraph, sep: str = "/") -> StateGraph:
+    """编译期优化：返回一个新的StateGraph，将状态结构兼容的已编译子图节点展开到父图中。
+
+    展开后的节点命名为"子图节点名{sep}子图内节点名"，并在metadata中记录所属子图，便于追踪；
+    子图节点的输入结构保持不变，仍只读取子图声明的字段。不满足展开条件的子图保持原样。
+    嵌套子图会递归展开。
+    """
+    # 找出可展开的子图节点：节点名 -> (展开后的子图builder, 入口节点名, 出口节点名)
+    inlined: Dict[str, Tuple[StateGraph, str, str]] = {}
+    for name, spec in builder.nodes.items():
+        if not isinstance(spec.runnable, CompiledStateGraph):
+            continue
+        reason = _incompatible_reason(builder, name, spec.runnable)
+        if reason:
+            logging.info(f"子图{name}不展开：{reason}")
+            continue
+        sub = inline_subgraphs(spec.runnable.builder, sep)
+        entry = next(end for start, end in sub.edges if start == START)
+        exit_ = next(start for start, end in sub.edges if end == END)
+        inlined[name] = (sub, f"{name}{sep}{entry}", f"{name}{sep}{exit_}")
+
+    # 未声明path_map的条件边可能在运行时返回子图节点名，此时无法安全改写
+    if inlined and any(b.ends is None for branches in builder.branches.values() for b in branches.values()):
+        logging.info("父图存在未声明path_map的条件边，不展开子图")
+        return builder
+
+    def as_target(node: str) -> str:
+        return inlined[node][1] if node in inlined else node
+
+    def as_source(node: str) -> str:
+        return inlined[node][2] if node in inlined else node
+
+    graph = StateGraph(
+        builder.state_schema,
+        builder.context_schema,
+        input_schema=builder.input_schema,
+        output_schema=builder.output_schema,
+    )
+
+    def copy_node(name: str, spec: Any, metadata: Optional[Dict[str, Any]] = None) -> None:
+        graph.add_node(
+            name,
+            spec.runnable,
+            defer=spec.defer,
+            metadata={**(spec.metadata or {}), **(metadata or {})} or None,
+            input_schema=spec.input_schema,
+            retry_policy=spec.retry_policy,
+            cache_policy=spec.cache_policy,
+            destinations=spec.ends or None,
+        )
+
+    # 节点
+    for name, spec in builder.nodes.items():
+        if name not in inlined:
+            copy_node(name, spec)
+            continue
+        sub = inlined[name][0]
+        for sub_name, sub_spec in sub.nodes.items():
+            copy_node(f"{name}{sep}{sub_name}", sub_spec, {"subgraph": name})
+        for start, end in sub.edges:
+            if start != START and end != END:
+                graph.add_edge(f"{name}{sep}{start}", f"{name}{sep}{end}")
+        for starts, end in sub.waiting_edges:
+            graph.add_edge([f"{name}{sep}{s}" for s in starts], f"{name}{sep}{end}")
+        for source, branches in sub.branches.items():
+            for branch in branches.values():
+                ends = {k: f"{name}{sep}{v}" for k, v in branch.ends.items()}
+                graph.add_conditional_edges(f"{name}{sep}{source}", branch.path, ends)
+
+    # 父图的边：指向子图的边改为指向子图入口，从子图出发的边改为从子图出口出发
+    for start, end in builder.edges:
+        graph.add_edge(as_source(start), as_target(end))
+    for starts, end in builder.waiting_edges:
+        graph.add_edge([as_source(s) for s in starts], as_target(end))
+    for source, branches in builder.branches.items():
+        for branch in branches.values():
+            ends = {k: as_target(v) for k, v in branch.ends.items()} if branch.ends else None
+            graph.add_conditional_edges(as_source(source), branch.path, ends)
+    return graph
+
+
+def compile_graph(builder: StateGraph, inline: bool = False, **kwargs: Any) -> CompiledStateGraph:
+    """编译图，inline=True时先展开兼容的子图"""
+    if inline:
+        builder = inline_subgraphs(builder)
+    return builder.compile(**kwargs)
@@ -0,0 +1,162 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram
+
+# 排队等待时间分桶：从立即放行到数十秒
+QUEUE_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# 未配置的租户统一归入该租户：共享同一个公平队列与指标标签
+OTHER_TENANT = "other"
+
+
+class AdmissionRejected(Exception):
+    """请求未被放行：status_code为建议返回的HTTP状态码，retry_after为建议的重试间隔（秒）"""
+
+    def __init__(self, reason: str, status_code: int, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """图运行的准入控制：限制同时执行的运行数，超出的请求进入按租户加权公平调度的队列。
+
+    - 优先级高的请求总是先于优先级低的请求放行；同一优先级内按加权公平队列（WFQ）：
+      每个请求的虚拟完成时间 = max(当前虚拟时间, 该租户上一个请求的虚拟完成时间) + 1 / 租户权重，
+      按虚拟完成时间从小到大放行，突发流量的租户只会拉长自己的队列
+    - 单个租户排队数超过max_queue_per_tenant时返回429；总队列已满、预计等待超过queue_timeout
+      或实际排队超时返回503，均附带Retry-After
+    - 优先级只来自服务端的priorities配置；weights、priorities与tenants之外的租户名
+      一律按OTHER_TENANT处理，客户端无法借伪造租户名插队或制造新的指标标签
+    """
+
+    def __init__(self, max_concurrency: int = 8, max_queue: int = 256, queue_timeout: float = 5.0,
+                 max_queue_per_tenant: Optional[int] = None, weights: Optional[Dict[str, float]] = None,
+                 default_weight: float = 1.0, priorities: Optional[Dict[str, int]] = None,
+                 tenants: Optional[Iterable[str]] = None, registry: CollectorRegistry = REGISTRY,
+                 namespace: str = "langgraph"):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_queue_per_tenant = max_queue_per_tenant or max_queue
+        self.weights = weights or {}
+        self.default_weight = default_weight
+        self.priorities = priorities or {}
+        self.tenants = frozenset(tenants or ()) | set(self.weights) | set(self.priorities) | {"default"}
+
+        self._active = 0
+        self._heap: List[Tuple[int, float, int, str, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._vtime = 0.0
+        self._last_finish: Dict[str, float] = {}
+        self._queued: Dict[str, int] = {}
+        self._queued_total = 0
+        self._service_time: Optional[float] = None  # 单次运行耗时的指数移动平均，用于估算等待时间
+
+        self.queue_wait = Histogram("admission_queue_wait_seconds", "准入排队等待时间", ["tenant", "outcome"],
+                                    namespace=namespace, buckets=QUEUE_WAIT_BUCKETS, registry=registry)
+        self.queue_depth = Gauge("admission_queue_depth", "准入排队中的请求数", namespace=namespace,
+                                 registry=registry, multiprocess_mode="livesum")
+        self.in_flight = Gauge("admission_in_flight", "已放行且执行中的运行数", namespace=namespace,
+                               registry=registry, multiprocess_mode="livesum")
+        self.rejected = Counter("admission_rejected", "被拒绝的请求数", ["tenant", "reason"],
+                                namespace=namespace, registry=registry)
+
+    def tenant_of(self, tenant: Optional[str]) -> str:
+        return tenant if tenant in self.tenants else OTHER_TENANT
+
+    def _estimated_wait(self, ahead: int) -> float:
+        if self._service_time is None:  # 尚无完成的运行，无法估算
+            return 0.0
+        return (ahead + 1) * self._service_time / self.max_concurrency
+
+    def _reject(self, tenant: str, reason: str, status_code: int) -> AdmissionRejected:
+        self.rejected.labels(tenant, reason).inc()
+        retry_after = max(1, math.ceil(self._estimated_wait(self._queued_total)))
+        return AdmissionRejected(reason, status_code, retry_after)
+
+    def _dequeued(self, tenant: str) -> None:
+        self._queued_total -= 1
+        self._queued[tenant] -= 1
+        if not self._queued[tenant]:
+            del self._queued[tenant]
+        self.queue_depth.dec()
+
+    def _dispatch(self) -> None:
+        """释放一个执行名额：交给队首的等待者，没有等待者时归还"""
+        while self._heap:
+            _, finish, _, tenant, future = heapq.heappop(self._heap)
+            if future.done():  # 已超时或已取消的等待者
+                continue
+            self._vtime = finish
+            if self._last_finish.get(tenant, 0.0) <= finish:
+                self._last_finish.pop(tenant, None)  # 该租户已无更晚的排队请求
+            future.set_result(None)
+            return
+        self._active -= 1
+        self.in_flight.dec()
+
+    async def acquire(self, tenant: str = "default") -> None:
+        tenant = self.tenant_of(tenant)
+        priority = self.priorities.get(tenant, 0)
+        if self._active < self.max_concurrency and not self._heap:
+            self._active += 1
+            self.in_flight.inc()
+            self.queue_wait.labels(tenant, "admitted").observe(0.0)
+            return
+
+        if self._queued_total >= self.max_queue:
+            raise self._reject(tenant, "queue_full", 503)
+        if self._queued.get(tenant, 0) >= self.max_queue_per_tenant:
+            raise self._reject(tenant, "tenant_queue_full", 429)
+        if self._estimated_wait(self._queued_total) > self.queue_timeout:
+            raise self._reject(tenant, "predicted_timeout", 503)
+
+        weight = self.weights.get(tenant, self.default_weight)
+        finish = max(self._vtime, self._last_finish.get(tenant, 0.0)) + 1.0 / weight
+        self._last_finish[tenant] = finish
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (-priority, finish, next(self._seq), tenant, future))
+        self._queued_total += 1
+        self._queued[tenant] = self._queued.get(tenant, 0) + 1
+        self.queue_depth.inc()
+
+        start = time.perf_counter()
+        try:
+            await asyncio.wait({future}, timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            # 客户端断开：若名额已分配则立即转交下一个等待者
+            self._dequeued(tenant)
+            if future.done() and not future.cancelled():
+                self._dispatch()
+            else:
+                future.cancel()
+            raise
+        self._dequeued(tenant)
+        if not future.done():
+            future.cancel()
+            self.queue_wait.labels(tenant, "timeout").observe(time.perf_counter() - start)
+            raise self._reject(tenant, "queue_timeout", 503)
+        self.queue_wait.labels(tenant, "admitted").observe(time.perf_counter() - start)
+
+    def release(self, service_time: Optional[float] = None) -> None:
+        if service_time is not None:
+            self._service_time = service_time if self._service_time is None \
+                else 0.8 * self._service_time + 0.2 * service_time
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, tenant: str = "default") -> AsyncIterator[None]:
+        """获取一个执行名额，退出时释放；未获准入时抛出AdmissionRejected"""
+        await self.acquire(tenant)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(time.perf_counter() - start)
@@ -0,0 +1,136 @@
+import asyncio
+import contextvars
+import time
+from contextlib import contextmanager, suppress
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Tuple
+
+from langchain_core.runnables import Runnable, RunnableConfig
+from prometheus_client import REGISTRY, CollectorRegistry, Counter
+
+# 当前运行的截止时间（time.monotonic()的绝对值），None表示不限时
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("run_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+class RunIncomplete(Exception):
+    """运行未成功完成（超时或客户端断开）：outcome为结果，state为已完成部分的状态。
+
+    以异常而不是普通返回值表示，SingleFlight等结果缓存不会把不完整的结果当作成功缓存。
+    """
+
+    def __init__(self, outcome: str, state: Optional[Dict[str, Any]]):
+        super().__init__(f"运行未完成：{outcome}")
+        self.outcome = outcome
+        self.state = state
+
+
+@contextmanager
+def deadline_scope(timeout: Optional[float]) -> Iterator[Optional[float]]:
+    """在当前上下文中设置截止时间；已存在更早的截止时间时保留更早的那个"""
+    current = _deadline.get()
+    deadline = current if timeout is None else time.monotonic() + timeout
+    if current is not None:
+        deadline = min(deadline, current)
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """距离截止时间的剩余秒数，可直接作为HTTP客户端等的超时参数；None表示不限时"""
+    deadline = _deadline.get()
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+
+def check_deadline() -> None:
+    """同步代码（重试循环、同步节点）中的协作式检查：已超过截止时间则抛出DeadlineExceeded"""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded("已超过运行截止时间")
+
+
+async def with_deadline(awaitable: Awaitable[Any]) -> Any:
+    """等待awaitable，最长不超过剩余时间；超时后取消它并抛出DeadlineExceeded"""
+    left = remaining()
+    if left is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, left)
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded("已超过运行截止时间") from None
+
+
+async def ainvoke_with_deadline(runnable: Runnable, input: Any, config: Optional[RunnableConfig] = None) -> Any:
+    """在剩余时间内调用LLM或工具，超时后取消进行中的请求"""
+    check_deadline()
+    return await with_deadline(runnable.ainvoke(input, config))
+
+
+class DeadlineRunner:
+    """带截止时间与取消的图运行。
+
+    以stream_mode="values"运行图并保留最近一次的完整状态：到达截止时间或客户端断开时取消运行，
+    返回(已完成部分的状态, 结果)，结果为success/timeout/disconnected。
+    被放弃运行已消耗的时间计入wasted_work_seconds，用于衡量无效工作量。
+    """
+
+    def __init__(self, registry: CollectorRegistry = REGISTRY, namespace: str = "langgraph"):
+        self.runs = Counter("deadline_runs", "带截止时间的运行数", ["graph", "outcome"],
+                            namespace=namespace, registry=registry)
+        self.wasted = Counter("wasted_work_seconds", "被放弃的运行已消耗的时间", ["graph", "reason"],
+                              namespace=namespace, registry=registry)
+
+    async def run(self, app: Any, inputs: Dict[str, Any], timeout: Optional[float], graph: str = "graph",
+                  config: Optional[RunnableConfig] = None,
+                  disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+                  poll_interval: float = 0.1) -> Tuple[Optional[Dict[str, Any]], str]:
+        latest: Dict[str, Any] = {}
+
+        async def consume() -> None:
+            async for state in app.astream(inputs, config, stream_mode="values"):
+                latest["state"] = state
+
+        start = time.perf_counter()
+        with deadline_scope(timeout) as deadline:
+            task = asyncio.ensure_future(consume())  # 任务复制当前上下文，节点中可读取截止时间
+
+        outcome = "timeout"
+        try:
+            while True:
+                left = None if deadline is None else deadline - time.monotonic()
+                if left is not None and left <= 0:
+                    break
+                wait = poll_interval if disconnected is not None else left
+                if wait is not None and left is not None:
+                    wait = min(wait, left)
+                done, _ = await asyncio.wait({task}, timeout=wait)
+                if done:
+                    try:
+                        task.result()
+                        outcome = "success"
+                    except DeadlineExceeded:  # 节点内的协作式检查先发现超时
+                        outcome = "timeout"
+                    except Exception:
+                        outcome = "error"
+                        raise
+                    break
+                if disconnected is not None and await disconnected():
+                    outcome = "disconnected"
+                    break
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            if not task.done():
+                task.cancel()
+                with suppress(asyncio.CancelledError, Exception):
+                    await task
+            self.runs.labels(graph, outcome).inc()
+            if outcome in ("timeout", "disconnected", "cancelled"):
+                self.wasted.labels(graph, outcome).inc(time.perf_counter() - start)
+        return latest.get("state"), outcome
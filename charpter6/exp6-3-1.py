@@ -0,0 +1,76 @@
+from langgraph.graph import StateGraph, END
+from typing import TypedDict
+from node_tracing import NodeTracer, JsonlSpanExporter
+import os
+import tempfile
+import timeit
+
+# 状态结构：输入文本与消息，追踪信息不再放入状态
+class TraceState(TypedDict):
+    input: str
+    messages: list
+
+# 节点1:文本预处理
+def normalize(state: TraceState) -> dict:
+    norm = state["input"].strip().lower()
+    return {"input": norm, "messages": state["messages"] + [{"role":"system", "content":f"标准化结果：{norm}"}]}
+
+# 节点2:判断是否为命令句式
+def classify_command(state: TraceState) -> dict:
+    if state["input"].startswith("please") or state["input"].endswith("!"):
+        content = "识别为命令语句"
+    else:
+        content = "非命令语句"
+    return {"messages": state["messages"] + [{"role":"system", "content":content}]}
+
+# 节点3:故意出错的节点，用于观察异常span
+def fail_on_empty(state: TraceState) -> dict:
+    if not state["input"]:
+        raise ValueError("输入为空")
+    return {}
+
+# 构建图结构，并为所有节点加上追踪
+builder = StateGraph(TraceState)
+builder.add_node("normalize", normalize)
+builder.add_node("classify", classify_command)
+builder.add_node("check", fail_on_empty)
+builder.set_entry_point("normalize")
+builder.add_edge("normalize","classify")
+builder.add_edge("classify","check")
+builder.add_edge("check", END)
+
+tracer = NodeTracer(capacity=1024, sample_rate=1.0)
+graph = tracer.instrument(builder).compile()
+
+trace_path = os.path.join(tempfile.mkdtemp(), "traces.jsonl")
+exporter = JsonlSpanExporter(tracer.buffer, trace_path, interval=0.5)
+exporter.start()
+
+# 测试执行
+result = tracer.invoke(graph, {"input":" Please send me the report. ", "messages":[]})
+for msg in result["messages"]:
+    print(f"{msg['role']}: {msg['content']}")
+try:
+    tracer.invoke(graph, {"input":"   ", "messages":[]})
+except ValueError as e:
+    print("执行异常：", e)
+
+exporter.stop()
+print(f"追踪记录（{trace_path}）：")
+with open(trace_path, encoding="utf-8") as f:
+    for line in f:
+        print(line.rstrip())
+
+# 追踪开销：对空节点函数分别测量未包装、包装后采样与包装后未采样的单次调用耗时
+def noop(state):
+    return state
+
+rounds = 200000
+state = {"input": "x", "messages": []}
+bare = timeit.timeit(lambda: noop(state), number=rounds)
+wrapped = NodeTracer(capacity=4096, sample_rate=1.0).wrap("noop", noop)
+sampled = timeit.timeit(lambda: wrapped(state), number=rounds)
+unsampled_wrapped = NodeTracer(sample_rate=0.0).wrap("noop", noop)
+unsampled = timeit.timeit(lambda: unsampled_wrapped(state), number=rounds)
+print(f"单节点追踪开销：采样 {(sampled - bare) / rounds * 1e6:.2f} µs，"
+      f"未采样 {(unsampled - bare) / rounds * 1e6:.2f} µs")
@@ -0,0 +1,98 @@
+from langgraph.graph import StateGraph
+from typing import TypedDict
+from fastapi import FastAPI, Header, Request
+from fastapi.responses import JSONResponse
+from graph_metrics import GraphMetrics
+from multiproc_metrics import metrics_asgi_app
+from admission import AdmissionController, AdmissionRejected
+from singleflight import SingleFlight
+from deadline import DeadlineRunner, RunIncomplete, check_deadline
+import os
+import random
+import asyncio
+
+# 定义状态结构体
+class FlowState(TypedDict):
+    input: str
+    output: str
+
+# 定义两个示例节点：无需再逐个添加监控装饰器
+async def fetch_data_node(state: FlowState) -> FlowState:
+    await asyncio.sleep(random.uniform(0.2, 0.5))
+    if random.random() < 0.1:
+        raise RuntimeError("数据获取失败")
+    return {"input":state["input"], "output":f"Fetched({state['input']})"}
+
+def process_data_node(state: FlowState) -> FlowState:
+    check_deadline()  # 同步节点无法被取消，开始前先检查是否已超过截止时间
+    return {"input":state["input"], "output":state["output"]+" -> Processed"}
+
+# 构建LangGraph图
+workflow = StateGraph(FlowState)
+workflow.add_node("fetch_data", fetch_data_node)
+workflow.add_node("process_data", process_data_node)
+workflow.set_entry_point("fetch_data")
+workflow.add_edge("fetch_data","process_data")
+workflow.set_finish_point("process_data")
+
+# 编译后统一埋点：图中全部节点自动记录耗时、并发数、异常与状态大小
+metrics = GraphMetrics()
+app_graph = metrics.instrument(workflow.compile(), "fetch_process")
+
+# 构建FastAPI应用与LangGraph集成，指标统一由/metrics暴露
+# 以gunicorn多worker运行时（见gunicorn_conf.py）自动汇总所有worker的指标
+app = FastAPI()
+app.mount("/metrics", metrics_asgi_app())
+
+# 准入控制：最多同时执行8次运行，其余请求按租户权重公平排队，排队超过5秒则拒绝；
+# 租户的权重与优先级只在服务端配置，未配置的租户名统一归入"other"
+admission = AdmissionController(max_concurrency=8, max_queue=200, queue_timeout=5.0,
+                                max_queue_per_tenant=50, weights={"premium": 4.0},
+                                priorities={"premium": 1})
+
+@app.exception_handler(AdmissionRejected)
+async def on_rejected(request: Request, e: AdmissionRejected):
+    return JSONResponse(status_code=e.status_code, headers={"Retry-After": str(e.retry_after)},
+                        content={"status":"rejected", "reason":e.reason})
+
+# 可选的请求合并：设置环境变量SINGLEFLIGHT=1开启，SINGLEFLIGHT_TTL为结果缓存秒数
+singleflight = SingleFlight(cache_ttl=float(os.environ.get("SINGLEFLIGHT_TTL", "0"))) \
+    if os.environ.get("SINGLEFLIGHT") == "1" else None
+
+# 每次运行的截止时间：超时或客户端断开时取消运行，以RunIncomplete返回已完成部分的状态
+deadlines = DeadlineRunner()
+
+async def run_graph(inputs: dict, tenant: str, timeout: float, disconnected=None):
+    async with admission.slot(tenant):
+        final_state, outcome = await deadlines.run(app_graph, inputs, timeout, "fetch_process",
+                                                   disconnected=disconnected)
+    if outcome != "success":
+        raise RunIncomplete(outcome, final_state)  # 不完整的结果不会被SingleFlight缓存
+    return final_state
+
+@app.get("/run/{text}")
+async def run_flow(request: Request, text: str, timeout: float = 10.0,
+                   x_tenant: str = Header("default")):
+    inputs = {"input":text}
+    tenant = admission.tenant_of(x_tenant)
+    try:
+        if singleflight is not None:
+            # 相同输入的并发请求只执行一次（合并后的执行占用一个准入名额）；
+            # 合并键包含租户与超时，只有准入条件和截止时间相同的请求才共享同一次执行；
+            # 共享的执行不随单个客户端断开而取消，全部等待者断开后由SingleFlight取消
+            key = {"inputs":inputs, "tenant":tenant, "timeout":timeout}
+            final_state = await singleflight.run("fetch_process", key, lambda: run_graph(inputs, tenant, timeout))
+        else:
+            final_state = await run_graph(inputs, tenant, timeout, request.is_disconnected)
+    except AdmissionRejected:
+        raise
+    except RunIncomplete as e:
+        return JSONResponse(status_code=504, content={"status":e.outcome, "partial":e.state})
+    except Exception as e:
+        return {"status":"error", "message":str(e)}
+    return {"status":"success", "result":final_state}
+
+# 单进程：python exp6-5-1.py；多进程：gunicorn -c gunicorn_conf.py "exp6-5-1:app"
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=8000)
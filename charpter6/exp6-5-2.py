@@ -0,0 +1,115 @@
+from langgraph.graph import StateGraph, END
+from typing import TypedDict, Optional
+from langchain_ollama import ChatOllama
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from graph_streaming import stream_graph_events, stream_graph_updates, sse_response, chunked_response, _dumps
+import asyncio
+import json
+from contextlib import aclosing
+
+# 定义工作流状态结构（与exp4-2相同）
+class StreamState(TypedDict):
+    user_input: str
+    stream_output: Optional[str]
+
+# 初始化语言模型
+llm = ChatOllama(model="qwen3:8b", temperature=0, base_url="http://127.0.0.1:11434", streaming=True)
+
+# 异步流式节点函数：token经由stream_mode="messages"实时转发给客户端，节点仍返回完整输出
+async def llm_stream_node(state: StreamState) -> StreamState:
+    content = state["user_input"]
+    prompt = f"请根据以下内容生成摘要：\n{content}"
+
+    buffer = []
+    async for chunk in llm.astream(prompt):
+        if hasattr(chunk, "content") and chunk.content:
+            buffer.append(chunk.content)
+
+    return {
+        "user_input": content,
+        "stream_output": "".join(buffer)
+    }
+
+# 构建LangGraph流程
+builder = StateGraph(StreamState)
+builder.add_node("stream", llm_stream_node)
+builder.add_edge("stream", END)
+builder.set_entry_point("stream")
+graph = builder.compile()
+
+# 并行分支图（与exp5-2相同）：extract_keywords比summarize早1秒完成
+class ParallelState(TypedDict):
+    input: str
+    summary: Optional[str]
+    keywords: Optional[str]
+    merged: Optional[str]
+
+async def summarize(state: ParallelState) -> ParallelState:
+    await asyncio.sleep(2)  # 模拟处理时间
+    return {"summary": f"摘要：{state['input'][:20]}..."}
+
+async def extract_keywords(state: ParallelState) -> ParallelState:
+    await asyncio.sleep(1)  # 模拟处理时间
+    words = [w.strip('.,!?') for w in state["input"].lower().split()]
+    return {"keywords":",".join(words[:5])}
+
+def merge_results(state: ParallelState) -> ParallelState:
+    return {"merged": f"Summary: {state['summary']} | Keywords: {state['keywords']}"}
+
+parallel_builder = StateGraph(ParallelState)
+parallel_builder.add_node("start", lambda state: state)
+parallel_builder.add_node("summarize", summarize)
+parallel_builder.add_node("extract_keywords", extract_keywords)
+parallel_builder.add_node("merge", merge_results)
+parallel_builder.set_entry_point("start")
+parallel_builder.add_edge("start", "summarize")
+parallel_builder.add_edge("start", "extract_keywords")
+parallel_builder.add_edge(["summarize", "extract_keywords"], "merge")
+parallel_builder.add_edge("merge", END)
+parallel_graph = parallel_builder.compile()
+
+app = FastAPI()
+
+# SSE：event: token（逐段文本）... event: final（完整状态）
+@app.get("/stream/sse")
+async def stream_sse(text: str):
+    return sse_response(stream_graph_events(graph, {"user_input": text, "stream_output": None}))
+
+# 分块传输：每行一个JSON事件，适用于不支持SSE的客户端
+@app.get("/stream/chunked")
+async def stream_chunked(text: str):
+    return chunked_response(stream_graph_events(graph, {"user_input": text, "stream_output": None}))
+
+# WebSocket：客户端发送{"input": "..."}，每个节点完成时收到一条增量消息
+# {"event": "update", "node": ..., "delta": {...}, "ts": ..., "elapsed_ms": ...}，最后收到{"event": "done"}
+# 消息格式不正确时收到{"event": "error", ...}，连接保持可用
+def parse_ws_request(text: str) -> str:
+    try:
+        request = json.loads(text)
+    except ValueError:
+        raise ValueError("消息不是合法的JSON") from None
+    if not isinstance(request, dict) or not isinstance(request.get("input"), str):
+        raise ValueError('消息格式应为{"input": "..."}')
+    return request["input"]
+
+@app.websocket("/ws/parallel")
+async def ws_parallel(websocket: WebSocket):
+    await websocket.accept()
+    try:
+        while True:
+            try:
+                text = parse_ws_request(await websocket.receive_text())
+            except ValueError as e:
+                await websocket.send_text(_dumps({"event": "error", "error": "BadRequest", "message": str(e)}))
+                continue
+            async with aclosing(stream_graph_updates(parallel_graph, {"input": text})) as updates:
+                async for kind, data in updates:
+                    # 与SSE相同的序列化方式，无法序列化的状态值转为字符串
+                    await websocket.send_text(_dumps({"event": kind, **data}))
+    except WebSocketDisconnect:
+        pass  # 发送失败时aclosing关闭生成器，图的运行随之取消
+
+# 启动：python exp6-5-2.py，或 uvicorn "exp6-5-2:app"
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=8001)
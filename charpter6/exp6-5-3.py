@@ -0,0 +1,131 @@
+from langgraph.graph import StateGraph, END
+from langchain_core.tools import tool
+from langchain_core.output_parsers import StrOutputParser
+from langchain_ollama import ChatOllama
+from typing import TypedDict, Optional
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from deadline import DeadlineRunner, DeadlineExceeded, ainvoke_with_deadline, check_deadline, remaining, with_deadline
+import asyncio
+import json
+import random
+
+# 截止时间传递到LLM与工具调用：每次调用最多等待运行的剩余时间，超时即取消进行中的请求
+llm = ChatOllama(model="qwen3:8b", temperature=0, base_url="http://127.0.0.1:11434")
+parser = StrOutputParser()
+
+# -----------------------------
+# 自问自答流程（与exp7-6llm相同）
+# -----------------------------
+class AskState(TypedDict):
+    question: str
+    answer: str
+    sub_question: str
+    sub_answer: str
+    need_tool: bool
+
+@tool
+def wiki_tool(query: str) -> str:
+    """Search simple encyclopedia facts."""
+    if "Einstein" in query:
+        return "Einstein's major contributions include the theory of relativity and the photoelectric effect."
+    return "No information found."
+
+async def check_need_info(state: AskState) -> AskState:
+    prompt = ("Decide whether the user question needs an external tool lookup. Return ONLY valid JSON "
+              "with keys need_tool (true/false) and sub_question (string).\n\n"
+              f"User question:\n{state['question']}")
+    raw = await ainvoke_with_deadline(llm | parser, prompt)
+    try:
+        data = json.loads(raw)
+        need_tool, sub_question = bool(data.get("need_tool", False)), data.get("sub_question", "")
+    except Exception:
+        need_tool, sub_question = "Einstein" in state["question"], state["question"]
+    return {**state, "need_tool": need_tool, "sub_question": sub_question}
+
+async def query_tool(state: AskState) -> AskState:
+    result = await ainvoke_with_deadline(wiki_tool, {"query": state["sub_question"]})
+    return {**state, "sub_answer": result}
+
+async def answer_with_tool_result(state: AskState) -> AskState:
+    prompt = (f"User question:\n{state['question']}\n\nTool result:\n{state['sub_answer']}\n\n"
+              "Answer the question in Chinese, using the tool result as the factual basis.")
+    final_answer = await ainvoke_with_deadline(llm | parser, prompt)
+    return {**state, "answer": final_answer}
+
+ask_builder = StateGraph(AskState)
+ask_builder.add_node("check_need_info", check_need_info)
+ask_builder.add_node("query_tool", query_tool)
+ask_builder.add_node("answer", answer_with_tool_result)
+ask_builder.set_entry_point("check_need_info")
+ask_builder.add_conditional_edges("check_need_info", lambda s: "query_tool" if s.get("need_tool") else "answer",
+                                  {"query_tool": "query_tool", "answer": "answer"})
+ask_builder.add_edge("query_tool", "answer")
+ask_builder.set_finish_point("answer")
+ask_graph = ask_builder.compile()
+
+# -----------------------------
+# 重试循环（与exp3-2相同）：每次重试前检查截止时间，退避等待也不超过剩余时间
+# -----------------------------
+class WorkflowState(TypedDict):
+    user_input: str
+    result: Optional[str]
+    retries: int
+    success: bool
+
+@tool
+async def flaky_tool(input_text: str) -> str:
+    """随机失败."""
+    await asyncio.sleep(random.uniform(0.5, 1.5))  # 模拟不稳定的外部接口
+    if random.random() < 0.5:
+        raise RuntimeError("临时错误：外部接口调用失败")
+    return f"处理完成：{input_text}"
+
+async def robust_node(state: WorkflowState) -> WorkflowState:
+    if state["success"]:
+        return state
+    retries = state["retries"]
+    if retries:
+        check_deadline()  # 剩余时间已用完时不再发起新的重试
+        await with_deadline(asyncio.sleep(0.5 * 2 ** (retries - 1)))  # 指数退避
+    try:
+        result = await ainvoke_with_deadline(flaky_tool, {"input_text": state["user_input"]})
+        return {**state, "result": result, "success": True}
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        print(f"[警告]第{retries + 1}次尝试失败：{e}，剩余时间：{remaining()}")
+        return {**state, "result": f"执行失败:{e}", "retries": retries + 1}
+
+robust_builder = StateGraph(WorkflowState)
+robust_builder.add_node("robust_execution", robust_node)
+robust_builder.set_entry_point("robust_execution")
+robust_builder.add_conditional_edges(
+    "robust_execution", lambda s: END if s["success"] or s["retries"] >= 5 else "robust_execution")
+robust_graph = robust_builder.compile()
+
+# -----------------------------
+# 服务：超时或客户端断开时取消运行并返回已完成部分的状态
+# -----------------------------
+app = FastAPI()
+deadlines = DeadlineRunner()
+
+async def run_with_deadline(request: Request, graph, inputs: dict, name: str, timeout: float):
+    final_state, outcome = await deadlines.run(graph, inputs, timeout, name, disconnected=request.is_disconnected)
+    if outcome != "success":
+        return JSONResponse(status_code=504, content={"status": outcome, "partial": final_state})
+    return {"status": "success", "result": final_state}
+
+@app.get("/ask/{question}")
+async def ask(request: Request, question: str, timeout: float = 30.0):
+    inputs = {"question": question, "answer": "", "sub_question": "", "sub_answer": "", "need_tool": False}
+    return await run_with_deadline(request, ask_graph, inputs, "self_ask", timeout)
+
+@app.get("/robust/{text}")
+async def robust(request: Request, text: str, timeout: float = 3.0):
+    inputs = {"user_input": text, "result": None, "retries": 0, "success": False}
+    return await run_with_deadline(request, robust_graph, inputs, "robust", timeout)
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=8001)
@@ -0,0 +1,55 @@
+from langgraph.graph import StateGraph, END
+from typing import TypedDict, Optional
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from graph_streaming import stream_graph_events
+import asyncio
+import itertools
+
+# 慢消费者与并行流式节点：两个节点的token交错到达，缓冲区按节点合并，长度保持有界
+
+class DualState(TypedDict):
+    topic: str
+    a: Optional[str]
+    b: Optional[str]
+
+TEXT = "token " * 500
+
+def streaming_node(key: str):
+    async def node(state: DualState) -> DualState:
+        # 使用langchain_core自带的假模型逐词输出，模拟LLM流式生成
+        llm = GenericFakeChatModel(messages=itertools.repeat(AIMessage(content=TEXT)))
+        parts = []
+        async for chunk in llm.astream(state["topic"]):
+            parts.append(chunk.content)
+            await asyncio.sleep(0)  # 让出事件循环，使两个节点的token交错
+        return {key: "".join(parts)}
+    return node
+
+builder = StateGraph(DualState)
+builder.add_node("start", lambda state: state)
+builder.add_node("node_a", streaming_node("a"))
+builder.add_node("node_b", streaming_node("b"))
+builder.set_entry_point("start")
+builder.add_edge("start", "node_a")
+builder.add_edge("start", "node_b")
+builder.add_edge(["node_a", "node_b"], END)
+graph = builder.compile()
+
+
+async def main():
+    received = {"node_a": [], "node_b": []}
+    frames = 0
+    async for kind, data in stream_graph_events(graph, {"topic": "x", "a": None, "b": None}, max_events=4):
+        frames += 1
+        if kind == "token":
+            received[data["node"]].append(data["text"])
+        await asyncio.sleep(0.05)  # 慢消费者
+    for node, texts in received.items():
+        assert "".join(texts) == TEXT, node
+    tokens = 2 * len(TEXT.split(" "))
+    print(f"约{tokens}个token，客户端收到{frames}帧，各节点文本完整")
+    assert frames < tokens // 10
+
+
+asyncio.run(main())
@@ -0,0 +1,137 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Iterator, Optional, Sequence
+
+import ormsgpack
+from langchain_core.runnables import Runnable, RunnableConfig
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram
+
+# 节点耗时分桶：覆盖从毫秒级的纯函数节点到数十秒的LLM调用
+NODE_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                        1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+# 整图耗时分桶：一次运行通常包含多次LLM调用
+RUN_LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0,
+                       60.0, 120.0, 300.0)
+# 状态大小分桶（字节）：64B ~ 16MB，按4倍递增
+STATE_SIZE_BUCKETS = tuple(64 * 4 ** i for i in range(10))
+
+
+def state_size(state: Any) -> int:
+    """状态序列化为msgpack后的字节数，无法序列化的对象按str处理"""
+    try:
+        return len(ormsgpack.packb(state, default=str, option=ormsgpack.OPT_NON_STR_KEYS))
+    except Exception:
+        return 0
+
+
+class _InstrumentedNode(Runnable):
+    """透明代理节点的Runnable，在调用前后记录指标；不经过回调系统，开销远低于再包一层RunnableLambda"""
+
+    def __init__(self, bound: Runnable, metrics: "GraphMetrics", graph: str, node: str):
+        self.bound = bound
+        self.metrics = metrics
+        self.graph = graph
+        self.name = node
+        self._latency = metrics.node_latency.labels(graph, node)
+        self._in_flight = metrics.node_in_flight.labels(graph, node)
+        self._state_size = metrics.node_state_size.labels(graph, node) if metrics.measure_state_size else None
+
+    def _start(self, input: Any) -> float:
+        if self._state_size is not None:
+            self._state_size.observe(state_size(input))
+        self._in_flight.inc()
+        return time.perf_counter()
+
+    def _finish(self, start: float, error: Optional[BaseException]) -> None:
+        self._latency.observe(time.perf_counter() - start)
+        self._in_flight.dec()
+        if error is not None:
+            self.metrics.node_errors.labels(self.graph, self.name, type(error).__name__).inc()
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        start = self._start(input)
+        try:
+            result = self.bound.invoke(input, config, **kwargs)
+        except BaseException as e:
+            self._finish(start, e)
+            raise
+        self._finish(start, None)
+        return result
+
+    async def ainvoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        start = self._start(input)
+        try:
+            result = await self.bound.ainvoke(input, config, **kwargs)
+        except BaseException as e:
+            self._finish(start, e)
+            raise
+        self._finish(start, None)
+        return result
+
+
+class GraphMetrics:
+    """图级自动埋点：为已编译图中的每个节点记录Prometheus指标，无需逐个节点添加装饰器。
+
+    - 节点耗时Histogram、执行中数量Gauge、按异常类型区分的错误Counter、输入状态大小Histogram
+    - 整图单次运行耗时Histogram（按成功/失败/取消区分）
+    同步与异步节点都适用。同一个registry只应创建一个GraphMetrics实例。
+    """
+
+    def __init__(self, registry: CollectorRegistry = REGISTRY, namespace: str = "langgraph",
+                 node_buckets: Sequence[float] = NODE_LATENCY_BUCKETS,
+                 run_buckets: Sequence[float] = RUN_LATENCY_BUCKETS,
+                 measure_state_size: bool = True):
+        self.measure_state_size = measure_state_size
+        self.node_latency = Histogram("node_latency_seconds", "节点执行耗时", ["graph", "node"],
+                                      namespace=namespace, buckets=node_buckets, registry=registry)
+        # 多进程模式下汇总仍存活worker的值；单进程下该参数不生效
+        self.node_in_flight = Gauge("node_in_flight", "正在执行的节点数", ["graph", "node"],
+                                    namespace=namespace, registry=registry, multiprocess_mode="livesum")
+        self.node_errors = Counter("node_errors", "节点异常次数", ["graph", "node", "exception"],
+                                   namespace=namespace, registry=registry)
+        self.node_state_size = Histogram("node_state_size_bytes", "节点输入状态大小", ["graph", "node"],
+                                         namespace=namespace, buckets=STATE_SIZE_BUCKETS, registry=registry)
+        self.run_latency = Histogram("graph_run_latency_seconds", "整图单次运行耗时", ["graph", "status"],
+                                     namespace=namespace, buckets=run_buckets, registry=registry)
+
+    def instrument(self, app: Any, graph_name: Optional[str] = None) -> Any:
+        """为已编译的图埋点（原地修改并返回该图），重复调用不会重复埋点"""
+        if getattr(app, "_graph_metrics", None) is not None:
+            return app
+        graph = graph_name or app.get_name()
+        for name, node in app.nodes.items():
+            if name.startswith("__"):  # 跳过__start__等内部节点
+                continue
+            node.bound = _InstrumentedNode(node.bound, self, graph, name)
+            node.__dict__.pop("node", None)  # 清除缓存的组合Runnable，使新的bound生效
+
+        # invoke/ainvoke内部分别调用stream/astream，在这两处统计整图耗时
+        stream, astream = app.stream, app.astream
+        run_latency = self.run_latency
+
+        def instrumented_stream(*args: Any, **kwargs: Any) -> Iterator[Any]:
+            start, status = time.perf_counter(), "error"
+            try:
+                yield from stream(*args, **kwargs)
+                status = "success"
+            except GeneratorExit:
+                status = "cancelled"
+                raise
+            finally:
+                run_latency.labels(graph, status).observe(time.perf_counter() - start)
+
+        async def instrumented_astream(*args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+            start, status = time.perf_counter(), "error"
+            try:
+                async for chunk in astream(*args, **kwargs):
+                    yield chunk
+                status = "success"
+            except (GeneratorExit, asyncio.CancelledError):
+                status = "cancelled"
+                raise
+            finally:
+                run_latency.labels(graph, status).observe(time.perf_counter() - start)
+
+        app.stream, app.astream = instrumented_stream, instrumented_astream
+        app._graph_metrics = self
+        return app
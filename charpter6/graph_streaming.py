@@ -0,0 +1,167 @@
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+from fastapi.responses import StreamingResponse
+from langchain_core.runnables import RunnableConfig
+from langgraph.channels.last_value import LastValue
+
+# 事件：(类型, 数据)，类型为 token / final / update / done / error
+Event = Tuple[str, Dict[str, Any]]
+
+
+# 缓冲区中最多同时存在的待发送事件数
+DEFAULT_MAX_EVENTS = 64
+
+
+class _EventBuffer:
+    """生产者与消费者之间的有界事件缓冲：每个节点最多只有一个待发送的token事件，
+    消费者较慢时，该节点后续的token（无论是否与其他节点的token交错到达）都合并进这一事件；
+    待发送事件数达到max_events时生产者等待消费者取走事件，缓冲区长度因此不超过max_events"""
+
+    def __init__(self, max_events: int = DEFAULT_MAX_EVENTS) -> None:
+        if max_events < 1:
+            raise ValueError("max_events必须大于0")
+        self._items: Deque[Event] = deque()
+        self._pending: Dict[str, List[str]] = {}  # 节点 -> 尚未取走的token文本片段
+        self._max_events = max_events
+        self._ready = asyncio.Event()
+        self._space = asyncio.Event()
+        self._space.set()
+        self._closed = False
+
+    async def _reserve(self) -> None:
+        while len(self._items) >= self._max_events:
+            self._space.clear()
+            await self._space.wait()
+
+    async def push_token(self, node: str, text: str) -> None:
+        parts = self._pending.get(node)
+        if parts is None:
+            await self._reserve()
+            parts = self._pending[node] = []
+            self._items.append(("token", {"node": node, "text": parts}))
+        parts.append(text)
+        self._ready.set()
+
+    async def push(self, kind: str, data: Dict[str, Any]) -> None:
+        await self._reserve()
+        self._items.append((kind, data))
+        self._ready.set()
+
+    def close(self) -> None:
+        self._closed = True
+        self._ready.set()
+
+    async def drain(self) -> Optional[List[Event]]:
+        """取出当前全部事件；缓冲区为空且已关闭时返回None"""
+        while not self._items:
+            if self._closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        items = [(kind, {**data, "text": "".join(data["text"])}) if kind == "token" else (kind, data)
+                 for kind, data in self._items]
+        self._items.clear()
+        self._pending.clear()
+        self._space.set()
+        return items
+
+
+async def stream_graph_events(app: Any, inputs: Dict[str, Any], config: Optional[RunnableConfig] = None,
+                              max_events: int = DEFAULT_MAX_EVENTS) -> AsyncIterator[Event]:
+    """运行图并逐个产出事件：节点内LLM生成的token（stream_mode="messages"），
+    结束时产出一个携带完整状态的final事件，出错时产出error事件。
+
+    消费者较慢时同一节点的token合并发送，待发送事件超过max_events时暂停图的执行。
+    """
+    buffer = _EventBuffer(max_events)
+
+    async def produce() -> None:
+        state: Optional[Dict[str, Any]] = None
+        try:
+            async for mode, chunk in app.astream(inputs, config, stream_mode=["messages", "values"]):
+                if mode == "messages":
+                    message, metadata = chunk
+                    text = message.content if isinstance(message.content, str) else ""
+                    if text:
+                        await buffer.push_token(metadata.get("langgraph_node", ""), text)
+                else:
+                    state = chunk
+            await buffer.push("final", {"state": state})
+        except Exception as e:
+            await buffer.push("error", {"error": type(e).__name__, "message": str(e)})
+        finally:
+            buffer.close()
+
+    task = asyncio.ensure_future(produce())
+    try:
+        while True:
+            events = await buffer.drain()
+            if events is None:
+                break
+            for event in events:
+                yield event
+    finally:
+        # 客户端断开时响应生成器被关闭，同时取消图的运行
+        if not task.done():
+            task.cancel()
+
+
+async def stream_graph_updates(app: Any, inputs: Dict[str, Any], config: Optional[RunnableConfig] = None,
+                               skip_unchanged: bool = True) -> AsyncIterator[Event]:
+    """运行图并在每个节点完成时产出update事件{node, delta, ts, elapsed_ms}（stream_mode="updates"），
+    并行分支各自完成即各自产出，最后产出done事件。
+
+    delta只包含节点写入的字段；skip_unchanged时再去掉与客户端已知值相同的普通字段
+    （例如透传节点原样返回的输入），带reducer的字段本身就是增量，始终保留。
+    """
+    last_value_keys = {k for k, ch in app.channels.items() if isinstance(ch, LastValue)}
+    known = dict(inputs)
+    start = time.perf_counter()
+    try:
+        async for chunk in app.astream(inputs, config, stream_mode="updates"):
+            for node, update in chunk.items():
+                if not isinstance(update, dict):
+                    continue
+                if skip_unchanged:
+                    update = {k: v for k, v in update.items()
+                              if k not in last_value_keys or k not in known or known[k] != v}
+                known.update((k, v) for k, v in update.items() if k in last_value_keys)
+                if update:
+                    yield "update", {"node": node, "delta": update, "ts": time.time(),
+                                     "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)}
+    except Exception as e:
+        yield "error", {"error": type(e).__name__, "message": str(e)}
+        return
+    yield "done", {"elapsed_ms": round((time.perf_counter() - start) * 1000, 1)}
+
+
+def _dumps(data: Any) -> str:
+    return json.dumps(data, ensure_ascii=False, default=str)
+
+
+async def _sse_body(events: AsyncIterator[Event]) -> AsyncIterator[str]:
+    async for kind, data in events:
+        yield f"event: {kind}\ndata: {_dumps(data)}\n\n"
+
+
+async def _ndjson_body(events: AsyncIterator[Event]) -> AsyncIterator[str]:
+    async for kind, data in events:
+        yield _dumps({"event": kind, **data}) + "\n"
+
+
+# 关闭代理缓冲，保证每个事件立即发送到客户端
+_STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def sse_response(events: AsyncIterator[Event]) -> StreamingResponse:
+    """以Server-Sent Events格式返回事件流"""
+    return StreamingResponse(_sse_body(events), media_type="text/event-stream", headers=_STREAM_HEADERS)
+
+
+def chunked_response(events: AsyncIterator[Event]) -> StreamingResponse:
+    """以分块传输的NDJSON格式返回事件流，每行一个事件"""
+    return StreamingResponse(_ndjson_body(events), media_type="application/x-ndjson", headers=_STREAM_HEADERS)
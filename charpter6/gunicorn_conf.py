@@ -0,0 +1,17 @@
+# gunicorn配置：以多个uvicorn worker运行exp6-5-1，并开启Prometheus多进程模式
+# 启动：gunicorn -c gunicorn_conf.py "exp6-5-1:app"
+import os
+from multiproc_metrics import mark_worker_dead, prepare_multiproc_dir
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", "4"))
+worker_class = "uvicorn_worker.UvicornWorker"  # uvicorn.workers已弃用，改用uvicorn-worker包
+
+# 配置文件在主进程中最先加载，此时设置环境变量可保证所有worker导入prometheus_client前已生效；
+# 指标文件写在该目录下的专用子目录中，只有该子目录会被清空
+prepare_multiproc_dir(os.environ.get("PROMETHEUS_MULTIPROC_DIR", "/tmp"))
+
+
+def child_exit(server, worker):
+    # worker退出（包括崩溃与重启）时清理其实时Gauge文件
+    mark_worker_dead(worker.pid)
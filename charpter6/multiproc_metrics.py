@@ -0,0 +1,49 @@
+import os
+import shutil
+from typing import Any
+
+# 注意：本模块不在顶层导入prometheus_client。
+# prometheus_client在导入时根据PROMETHEUS_MULTIPROC_DIR决定指标值的存储方式，
+# 因此必须先调用prepare_multiproc_dir设置好环境变量，再导入定义指标的模块。
+
+MULTIPROC_ENV = "PROMETHEUS_MULTIPROC_DIR"
+# 指标文件放在该专用子目录中，启动时只清空这个子目录
+MULTIPROC_SUBDIR = "langgraph_prometheus"
+
+
+def multiprocess_enabled() -> bool:
+    return MULTIPROC_ENV in os.environ
+
+
+def prepare_multiproc_dir(base: str) -> str:
+    """在主进程启动时调用：在base下建立专用子目录作为多进程指标目录，清空上次运行残留的指标文件。
+
+    只删除专用子目录，不会清空base本身；返回实际使用的目录。
+    """
+    base = os.path.abspath(base)
+    path = base if os.path.basename(base) == MULTIPROC_SUBDIR else os.path.join(base, MULTIPROC_SUBDIR)
+    if os.path.islink(path):
+        raise ValueError(f"多进程指标目录{path}是符号链接，拒绝清空")
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    os.makedirs(path)
+    os.environ[MULTIPROC_ENV] = path
+    return path
+
+
+def mark_worker_dead(pid: int) -> None:
+    """worker进程退出后调用：删除该进程的livesum/liveall等实时Gauge文件，避免已退出进程的值继续被计入"""
+    if multiprocess_enabled():
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(pid)
+
+
+def metrics_asgi_app() -> Any:
+    """/metrics的ASGI应用：多进程模式下每次抓取时汇总所有worker的指标文件，否则直接暴露当前进程的指标"""
+    from prometheus_client import CollectorRegistry, make_asgi_app
+    if not multiprocess_enabled():
+        return make_asgi_app()
+    from prometheus_client import multiprocess
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return make_asgi_app(registry=registry)
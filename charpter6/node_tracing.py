@@ -0,0 +1,215 @@
+import asyncio
+import contextvars
+import functools
+import itertools
+import json
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from langgraph.graph import StateGraph
+
+
+class Span(NamedTuple):
+    name: str
+    run_id: Optional[str]
+    start_ns: int  # perf_counter_ns，仅用于计算耗时与排序
+    end_ns: int
+    status: str  # "ok" / "error"
+    error: Optional[str]
+    input_size: int
+    output_size: int
+
+
+# 当前运行的run_id；值为None表示本次运行未被采样，未设置表示没有处于任何运行中
+_NO_RUN = object()
+_current_run: contextvars.ContextVar = contextvars.ContextVar("trace_run", default=_NO_RUN)
+
+
+def _default_size(value: Any) -> int:
+    # 只统计字段个数，避免在热路径上序列化状态
+    return len(value) if isinstance(value, dict) else 0
+
+
+class SpanRingBuffer:
+    """固定容量的span环形缓冲区：写满后覆盖最旧的记录，写入不加锁"""
+
+    def __init__(self, capacity: int = 4096):
+        self.capacity = capacity
+        self._slots: List[Optional[Tuple[int, Span]]] = [None] * capacity
+        self._seq = itertools.count()  # next()在GIL下是原子的
+
+    def append(self, span: Span) -> None:
+        seq = next(self._seq)
+        self._slots[seq % self.capacity] = (seq, span)
+
+    def read_since(self, seq: int) -> Tuple[List[Span], int, int]:
+        """读取序号>=seq的span，返回(span列表, 下一个读取序号, 被覆盖而丢失的条数)"""
+        entries = sorted(e for e in list(self._slots) if e is not None and e[0] >= seq)
+        if not entries:
+            return [], seq, 0
+        dropped = entries[0][0] - seq
+        return [span for _, span in entries], entries[-1][0] + 1, dropped
+
+    def snapshot(self) -> List[Span]:
+        return self.read_since(0)[0]
+
+
+class NodeTracer:
+    """节点级追踪：span记录在状态之外的环形缓冲区中，不会随状态增长或被checkpoint序列化。
+
+    - sample_rate按运行采样：在start_run时决定，整次运行的节点要么全部记录要么全部跳过
+    - 不在任何运行中调用的节点按单次调用采样，run_id为None
+    - size_fn用于计算输入/输出大小，默认只统计字段数
+    """
+
+    def __init__(self, capacity: int = 4096, sample_rate: float = 1.0,
+                 size_fn: Callable[[Any], int] = _default_size):
+        self.buffer = SpanRingBuffer(capacity)
+        self.sample_rate = sample_rate
+        self.size_fn = size_fn
+
+    def _sampled(self) -> bool:
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    @contextmanager
+    def start_run(self, run_id: Optional[str] = None) -> Iterator[Optional[str]]:
+        run_id = (run_id or uuid.uuid4().hex) if self._sampled() else None
+        token = _current_run.set(run_id)
+        try:
+            yield run_id
+        finally:
+            _current_run.reset(token)
+
+    def _active_run(self) -> Tuple[bool, Optional[str]]:
+        run = _current_run.get()
+        if run is _NO_RUN:
+            return self._sampled(), None
+        return run is not None, run
+
+    def _record(self, name: str, run_id: Optional[str], start_ns: int, state: Any,
+                result: Any, error: Optional[BaseException]) -> None:
+        end_ns = time.perf_counter_ns()
+        size = self.size_fn
+        self.buffer.append(Span(
+            name, run_id, start_ns, end_ns,
+            "error" if error is not None else "ok",
+            type(error).__name__ if error is not None else None,
+            size(state), size(result) if error is None else 0,
+        ))
+
+    def wrap(self, name: str, func: Callable) -> Callable:
+        """包装节点函数（同步或异步），保留原函数签名以便LangGraph照常传入config等参数"""
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(state, *args, **kwargs):
+                sampled, run_id = self._active_run()
+                if not sampled:
+                    return await func(state, *args, **kwargs)
+                start_ns = time.perf_counter_ns()
+                try:
+                    result = await func(state, *args, **kwargs)
+                except BaseException as e:
+                    self._record(name, run_id, start_ns, state, None, e)
+                    raise
+                self._record(name, run_id, start_ns, state, result, None)
+                return result
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(state, *args, **kwargs):
+            sampled, run_id = self._active_run()
+            if not sampled:
+                return func(state, *args, **kwargs)
+            start_ns = time.perf_counter_ns()
+            try:
+                result = func(state, *args, **kwargs)
+            except BaseException as e:
+                self._record(name, run_id, start_ns, state, None, e)
+                raise
+            self._record(name, run_id, start_ns, state, result, None)
+            return result
+        return wrapper
+
+    def node(self, name: str) -> Callable[[Callable], Callable]:
+        """装饰器形式，用法与exp6-3中的with_logging相同"""
+        return functools.partial(self.wrap, name)
+
+    def instrument(self, builder: StateGraph) -> StateGraph:
+        """为builder中已添加的全部节点加上追踪，需在compile之前调用"""
+        for name, spec in builder.nodes.items():
+            runnable = spec.runnable
+            func, afunc = getattr(runnable, "func", None), getattr(runnable, "afunc", None)
+            if func is not None or afunc is not None:
+                # 普通函数节点：直接替换内部函数，不增加额外的Runnable层
+                if func is not None:
+                    runnable.func = self.wrap(name, func)
+                if afunc is not None and afunc is not func:
+                    runnable.afunc = self.wrap(name, afunc)
+            else:
+                # 子图等其他Runnable：外包一层
+                def run(state: Dict[str, Any], config: RunnableConfig, _r=runnable) -> Any:
+                    return _r.invoke(state, config)
+
+                async def arun(state: Dict[str, Any], config: RunnableConfig, _r=runnable) -> Any:
+                    return await _r.ainvoke(state, config)
+
+                spec.runnable = RunnableLambda(self.wrap(name, run), afunc=self.wrap(name, arun), name=name)
+        return builder
+
+    def invoke(self, app: Any, inputs: Dict[str, Any], config: Optional[RunnableConfig] = None,
+               run_id: Optional[str] = None) -> Any:
+        with self.start_run(run_id):
+            return app.invoke(inputs, config)
+
+    async def ainvoke(self, app: Any, inputs: Dict[str, Any], config: Optional[RunnableConfig] = None,
+                      run_id: Optional[str] = None) -> Any:
+        with self.start_run(run_id):
+            return await app.ainvoke(inputs, config)
+
+
+class JsonlSpanExporter:
+    """后台线程定期把环形缓冲区中的新span追加写入本地JSONL文件，格式化开销不在节点执行路径上"""
+
+    def __init__(self, buffer: SpanRingBuffer, path: str, interval: float = 1.0):
+        self.buffer = buffer
+        self.path = path
+        self.interval = interval
+        self.exported = 0
+        self.dropped = 0
+        self._next_seq = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def flush(self) -> int:
+        spans, self._next_seq, dropped = self.buffer.read_since(self._next_seq)
+        self.dropped += dropped
+        if spans:
+            with open(self.path, "a", encoding="utf-8") as f:
+                for span in spans:
+                    record = span._asdict()
+                    record["duration_us"] = (span.end_ns - span.start_ns) / 1000
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.exported += len(spans)
+        return len(spans)
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="span-exporter", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
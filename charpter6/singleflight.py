@@ -0,0 +1,86 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from prometheus_client import REGISTRY, CollectorRegistry, Counter
+
+
+def normalize_input(inputs: Any) -> str:
+    """输入的规范化表示：与字典键顺序无关"""
+    return json.dumps(inputs, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+class SingleFlight:
+    """合并相同的并发运行：同一图、相同输入的请求在执行期间只运行一次，所有等待者共享同一结果。
+
+    - 键为 graph_id + 规范化输入的哈希，可通过key_fn自定义规范化方式
+    - 单个等待者取消（如客户端断开）不影响共享的执行；全部等待者都取消后才取消执行
+    - cache_ttl > 0时，成功的结果在完成后继续缓存cache_ttl秒；异常不缓存
+    - 共享的结果对象会返回给多个调用方，调用方不应原地修改
+    """
+
+    def __init__(self, cache_ttl: float = 0.0, max_cache: int = 1024,
+                 key_fn: Callable[[Any], str] = normalize_input,
+                 registry: CollectorRegistry = REGISTRY, namespace: str = "langgraph"):
+        self.cache_ttl = cache_ttl
+        self.max_cache = max_cache
+        self.key_fn = key_fn
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+        self._cache: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.requests = Counter("singleflight_requests", "合并层处理的请求数", ["graph", "outcome"],
+                                namespace=namespace, registry=registry)
+
+    def _key(self, graph_id: str, inputs: Any) -> str:
+        digest = hashlib.sha256(self.key_fn(inputs).encode("utf-8")).hexdigest()
+        return f"{graph_id}:{digest}"
+
+    def _cached(self, key: str) -> Tuple[bool, Any]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return False, None
+        expires, result = entry
+        if expires < time.monotonic():
+            del self._cache[key]
+            return False, None
+        self._cache.move_to_end(key)
+        return True, result
+
+    def _on_done(self, key: str, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        self._waiters.pop(key, None)
+        if self.cache_ttl > 0 and not task.cancelled() and task.exception() is None:
+            self._cache[key] = (time.monotonic() + self.cache_ttl, task.result())
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_cache:
+                self._cache.popitem(last=False)
+
+    async def run(self, graph_id: str, inputs: Any, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """执行fn()并返回结果；已有相同的执行时直接等待其结果"""
+        key = self._key(graph_id, inputs)
+        hit, result = self._cached(key)
+        if hit:
+            self.requests.labels(graph_id, "cache_hit").inc()
+            return result
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, key=key: self._on_done(key, t))
+            self.requests.labels(graph_id, "leader").inc()
+        else:
+            self.requests.labels(graph_id, "coalesced").inc()
+
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and self._inflight.get(key) is task:
+                self._waiters[key] -= 1
+                if not self._waiters[key]:
+                    task.cancel()  # 已无等待者，不再继续执行
+            raise
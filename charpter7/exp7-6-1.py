@@ -0,0 +1,234 @@
+from langgraph.graph import StateGraph
+from langchain_core.runnables import RunnableLambda
+from langchain_core.tools import tool
+from langchain_ollama import ChatOllama
+from langchain_core.output_parsers import StrOutputParser
+from typing import TypedDict, List, Dict
+import asyncio
+import ast
+import json
+import operator
+import re
+import time
+
+# -----------------------------
+# 1. 定义状态：子问题由单个变为列表
+# -----------------------------
+class AskState(TypedDict):
+    question: str
+    answer: str
+    sub_questions: List[Dict[str, str]]  # [{"tool": 工具名, "query": 子问题}]
+    sub_answers: List[Dict[str, str]]    # [{"tool", "query", "answer"}]，与sub_questions顺序一致
+
+
+# -----------------------------
+# 2. 初始化本地 Ollama 大模型
+# -----------------------------
+llm = ChatOllama(
+    model="qwen3:8b",
+    temperature=0,
+    base_url="http://127.0.0.1:11434",
+)
+
+parser = StrOutputParser()
+
+# 同时进行的工具调用数上限
+MAX_TOOL_CONCURRENCY = 4
+
+
+# -----------------------------
+# 3. 定义工具
+# -----------------------------
+FACTS = {
+    "Einstein": "Einstein's major contributions include the special and general theories of relativity "
+                "and his explanation of the photoelectric effect, which helped establish quantum theory.",
+    "Newton": "Newton formulated the laws of motion and universal gravitation and co-invented calculus.",
+    "Curie": "Marie Curie pioneered research on radioactivity and discovered polonium and radium.",
+}
+
+@tool
+def wiki_tool(query: str) -> str:
+    """Search simple encyclopedia facts."""
+    time.sleep(0.5)  # 模拟远程查询耗时
+    found = [fact for name, fact in FACTS.items() if name.lower() in query.lower()]
+    return " ".join(found) if found else "No information found."
+
+# 表达式来自LLM：不支持乘方（如9**9**9会长时间占用CPU），并限制表达式长度
+_OPERATORS = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+              ast.Div: operator.truediv, ast.USub: operator.neg}
+MAX_EXPRESSION_LENGTH = 100
+
+def _eval(node):
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+        return node.value
+    if isinstance(node, ast.BinOp) and type(node.op) in _OPERATORS:
+        return _OPERATORS[type(node.op)](_eval(node.left), _eval(node.right))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _OPERATORS:
+        return _OPERATORS[type(node.op)](_eval(node.operand))
+    raise ValueError("unsupported expression")
+
+@tool
+def calculator(query: str) -> str:
+    """Evaluate an arithmetic expression (+, -, *, /) such as '1955 - 1879'."""
+    if len(query) > MAX_EXPRESSION_LENGTH:
+        raise ValueError("expression too long")
+    return str(_eval(ast.parse(query, mode="eval").body))
+
+TOOLS = {"wiki_tool": wiki_tool, "calculator": calculator}
+
+
+# -----------------------------
+# 4. 节点1：让 LLM 判断需要哪些查询，一次生成全部子问题
+# -----------------------------
+def _parse_plan(raw: str) -> List[Dict[str, str]]:
+    raw = re.sub(r"<think>.*?</think>", "", raw, flags=re.S)
+    match = re.search(r"\{.*\}", raw, flags=re.S)
+    data = json.loads(match.group(0) if match else raw)
+    plan = []
+    for item in data.get("sub_questions", []):
+        if isinstance(item, dict) and item.get("tool") in TOOLS and item.get("query"):
+            plan.append({"tool": item["tool"], "query": str(item["query"])})
+    return plan
+
+async def check_need_info(state: AskState) -> AskState:
+    prompt = f"""
+You are a planner for a QA workflow.
+
+Break the user question into the independent lookups needed to answer it.
+Available tools:
+- wiki_tool: encyclopedia facts about a person or topic
+- calculator: arithmetic expressions, e.g. "1955 - 1879"
+
+Return ONLY valid JSON of the form:
+{{"sub_questions": [{{"tool": "wiki_tool", "query": "..."}}, ...]}}
+Use an empty list if no lookup is needed.
+
+User question:
+{state["question"]}
+""".strip()
+
+    raw = await (llm | parser).ainvoke(prompt)
+    print("LLM raw planner output:", raw)
+
+    try:
+        sub_questions = _parse_plan(raw)
+    except Exception:
+        # 保底逻辑：对问题中出现的每个已知人物各查询一次
+        sub_questions = [{"tool": "wiki_tool", "query": f"What were {name}'s major contributions?"}
+                         for name in FACTS if name.lower() in state["question"].lower()]
+
+    return {
+        **state,
+        "sub_questions": sub_questions,
+    }
+
+
+# -----------------------------
+# 5. 节点2：并发调用工具，总耗时约等于最慢的一次调用
+# -----------------------------
+async def query_tools(state: AskState) -> AskState:
+    semaphore = asyncio.Semaphore(MAX_TOOL_CONCURRENCY)
+
+    async def resolve(item: Dict[str, str]) -> Dict[str, str]:
+        async with semaphore:
+            try:
+                result = await TOOLS[item["tool"]].ainvoke({"query": item["query"]})
+            except Exception as e:
+                result = f"Tool error: {e}"  # 单个子问题失败不影响其他子问题
+        return {**item, "answer": result}
+
+    start = time.perf_counter()
+    sub_answers = await asyncio.gather(*(resolve(item) for item in state["sub_questions"]))
+    print(f"{len(sub_answers)}个子问题查询耗时：{time.perf_counter() - start:.2f}s")
+    return {
+        **state,
+        "sub_answers": list(sub_answers)
+    }
+
+
+# -----------------------------
+# 6. 节点3：让 LLM 基于全部工具结果组织最终答案
+# -----------------------------
+async def answer_with_tool_result(state: AskState) -> AskState:
+    tool_results = "\n".join(
+        f"- [{item['tool']}] {item['query']}\n  {item['answer']}" for item in state["sub_answers"]
+    ) or "(none)"
+    prompt = f"""
+You are a helpful assistant.
+
+Answer the user's question naturally and clearly.
+
+User question:
+{state["question"]}
+
+Tool results:
+{tool_results}
+
+Requirements:
+- Write in Chinese
+- Use the tool results as the factual basis
+- Make the answer complete and easy to understand
+""".strip()
+
+    final_answer = await (llm | parser).ainvoke(prompt)
+
+    return {
+        **state,
+        "answer": final_answer
+    }
+
+
+# -----------------------------
+# 7. 条件路由
+# -----------------------------
+def route_edge(state: AskState) -> str:
+    if state.get("sub_questions"):
+        return "query_tools"
+    return "answer"
+
+
+# -----------------------------
+# 8. 构建图
+# -----------------------------
+graph = StateGraph(AskState)
+
+graph.add_node("check_need_info", RunnableLambda(check_need_info))
+graph.add_node("query_tools", RunnableLambda(query_tools))
+graph.add_node("answer", RunnableLambda(answer_with_tool_result))
+
+graph.set_entry_point("check_need_info")
+
+graph.add_conditional_edges(
+    "check_need_info",
+    route_edge,
+    {
+        "query_tools": "query_tools",
+        "answer": "answer"
+    }
+)
+
+graph.add_edge("query_tools", "answer")
+graph.set_finish_point("answer")
+
+compiled_graph = graph.compile()
+
+
+# -----------------------------
+# 9. 运行
+# -----------------------------
+async def main():
+    input_state = {
+        "question": "Compare the contributions of Einstein, Newton and Marie Curie",
+        "answer": "",
+        "sub_questions": [],
+        "sub_answers": []
+    }
+
+    final_state = await compiled_graph.ainvoke(input_state)
+
+    for item in final_state["sub_answers"]:
+        print(f"[{item['tool']}] {item['query']} -> {item['answer']}")
+    print("最终回答：", final_state["answer"])
+
+
+asyncio.run(main())
@@ -0,0 +1,73 @@
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from local_kb import LocalKB, build_index, write_kb
+
+# 本地知识库查询耗时基准：python exp7-6-3.py [实体数，默认1000000]
+N = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+QUERIES = 20_000
+
+random.seed(0)
+SYLLABLES = [a + b for a in "bdfghklmnprstvz" for b in "aeiou"]
+FIELDS = ["optics", "thermodynamics", "number theory", "genetics", "astronomy", "topology", "chemistry"]
+
+
+def random_word(k: int) -> str:
+    return "".join(random.choices(SYLLABLES, k=k)).capitalize()
+
+
+def synthetic_entities(n: int):
+    """生成n个虚构人物：名+姓，姓作为别名"""
+    first_names = [random_word(2) for _ in range(500)]
+    for _ in range(n):
+        first, last = random.choice(first_names), random_word(4)
+        name = f"{first} {last}"
+        yield {
+            "name": name,
+            "aliases": [last],
+            "facts": [f"{name} was born in {random.randint(1700, 1990)}.",
+                      f"{last}'s major contributions include work on {random.choice(FIELDS)}."],
+        }
+
+
+def bench(kb: LocalKB, queries):
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        kb.answer(query)
+        timings.append((time.perf_counter() - start) * 1e6)
+    timings.sort()
+    return statistics.mean(timings), timings[len(timings) // 2], timings[int(len(timings) * 0.99)]
+
+
+workdir = tempfile.mkdtemp()
+try:
+    for size in (1_000, N):
+        source = os.path.join(workdir, f"kb{size}.jsonl")
+        entities = list(synthetic_entities(size))
+        write_kb(source, entities)
+
+        start = time.perf_counter()
+        index = build_index(source)
+        build_seconds = time.perf_counter() - start
+        print(f"\nN={size}: 建索引 {build_seconds:.1f}s，索引文件 {os.path.getsize(index) / 2 ** 20:.1f}MB")
+
+        samples = random.choices(entities, k=QUERIES)
+        cases = {
+            "姓氏命中": [f"What were {e['aliases'][0]}'s major contributions?" for e in samples],
+            "全名命中": [f"When was {e['name']} born?" for e in samples],
+            "两个实体": [f"Compare {a['name']} and {b['aliases'][0]}" for a, b in zip(samples, reversed(samples))],
+            "未命中": [f"What were {random_word(4)}'s major contributions?" for _ in samples],
+        }
+        del entities
+
+        with LocalKB(index) as kb:
+            for label, queries in cases.items():
+                mean, p50, p99 = bench(kb, queries)
+                print(f"  {label}: 平均 {mean:.1f}µs  p50 {p50:.1f}µs  p99 {p99:.1f}µs")
+finally:
+    shutil.rmtree(workdir)
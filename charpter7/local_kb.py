@@ -0,0 +1,403 @@
+import array
+import bisect
+import json
+import mmap
+import os
+import re
+import shutil
+import struct
+import sys
+import tempfile
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from langchain_core.tools import BaseTool, StructuredTool
+
+INDEX_SUFFIX = ".kbidx"
+NOT_FOUND = "No information found."
+
+_MAGIC = b"LGKB"
+_VERSION = 1
+# 索引文件中的各段：(名称, array类型码)，"B"为原始字节
+_SECTIONS = (
+    ("vocab_slots", "I"),    # 词表哈希表，存token_id+1，0为空槽
+    ("token_offsets", "Q"),  # token_id -> token_bytes中的起止位置
+    ("token_bytes", "B"),
+    ("root_goto", "I"),      # token_id -> 根节点的子节点，根节点转移O(1)
+    ("edge_start", "I"),     # 节点 -> edge_label/edge_target中的起止位置（CSR）
+    ("edge_label", "I"),     # 每个节点的出边按token_id升序排列，二分查找
+    ("edge_target", "I"),
+    ("fail", "I"),           # Aho-Corasick失败指针
+    ("dict_link", "I"),      # 沿失败链最近的有输出节点，0表示没有
+    ("depth", "I"),          # 节点对应的token数，用于计算匹配区间
+    ("out_start", "I"),      # 倒排表：节点 -> 以该节点结尾的别名所属实体
+    ("out_entity", "I"),
+    ("name_offsets", "Q"),
+    ("name_bytes", "B"),
+    ("fact_start", "I"),     # 倒排表：实体 -> 事实编号区间
+    ("fact_offsets", "Q"),
+    ("fact_bytes", "B"),
+)
+_HEADER = struct.Struct("<4sII")
+_SECTION = struct.Struct("<QQ")
+
+# 中日韩文字按单字切分，其余按连续的字母数字切分
+_CJK = "㐀-䶿一-鿿豈-﫿"
+_TOKEN = re.compile(rf"[{_CJK}]|[^\W_{_CJK}]+")
+_STOPWORDS = frozenset("a an and are as at be by did do does for from has have how in is it of on or "
+                       "the to was were what when where which who whom why with s".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """建索引与查询共用的分词：忽略大小写与标点"""
+    return _TOKEN.findall(text.casefold())
+
+
+def _slot(token: bytes, mask: int) -> int:
+    return zlib.crc32(token) & mask
+
+
+class _SectionWriter:
+    def __init__(self, f):
+        self.f = f
+        self.table: Dict[str, Tuple[int, int]] = {}
+
+    def write(self, name: str, data) -> None:
+        self._align()
+        start = self.f.tell()
+        if isinstance(data, array.array):
+            data.tofile(self.f)
+        elif isinstance(data, (bytes, bytearray)):
+            self.f.write(data)
+        else:  # 临时文件
+            data.seek(0)
+            shutil.copyfileobj(data, self.f, 1 << 20)
+        self.table[name] = (start, self.f.tell() - start)
+
+    def _align(self) -> None:
+        pad = -self.f.tell() % 8
+        if pad:
+            self.f.write(b"\0" * pad)
+
+
+def _check_entry(item: Any) -> Tuple[str, List[str], List[str]]:
+    """校验实体条目的类型，返回(名称, 事实列表, 别名列表)"""
+    if not isinstance(item, dict):
+        raise ValueError(f"条目应为对象，实际为{type(item).__name__}")
+    name = item["name"]
+    if not isinstance(name, str):
+        raise ValueError(f"name应为字符串，实际为{type(name).__name__}")
+    fields = []
+    for field in ("facts", "aliases"):
+        values = item.get(field, [])
+        if not isinstance(values, list):
+            raise ValueError(f"{field}应为列表，实际为{type(values).__name__}")
+        for value in values:
+            if not isinstance(value, str):
+                raise ValueError(f"{field}中的元素应为字符串，实际为{type(value).__name__}：{value!r}")
+        fields.append(values)
+    return name, fields[0], fields[1]
+
+
+def build_index(source: str, index_path: Optional[str] = None, force: bool = False) -> str:
+    """把JSONL知识库编译为可内存映射的索引文件，返回索引路径。
+
+    每行一个实体：{"name": ..., "aliases": [...], "facts": [...]}。
+    索引比源文件新时直接复用；写入临时文件后原子替换，正在使用旧索引的进程不受影响。
+    """
+    index_path = index_path or os.path.splitext(source)[0] + INDEX_SUFFIX
+    if not force and os.path.exists(index_path) and os.path.getmtime(index_path) >= os.path.getmtime(source):
+        return index_path
+    if sys.byteorder != "little":
+        raise RuntimeError("索引文件按小端序存储，当前平台不支持")
+
+    vocab: Dict[str, int] = {}
+    keys: List[Tuple[Tuple[int, ...], int]] = []
+    name_offsets, names = array.array("Q", [0]), bytearray()
+    fact_start, fact_offsets = array.array("I", [0]), array.array("Q", [0])
+    facts = tempfile.TemporaryFile(dir=os.path.dirname(os.path.abspath(index_path)))
+    try:
+        with open(source, encoding="utf-8") as f:
+            for lineno, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    item = json.loads(line)
+                    name, item_facts, item_aliases = _check_entry(item)
+                except (ValueError, KeyError) as e:
+                    raise ValueError(f"{source}:{lineno}: 无效的知识库条目：{e}") from e
+                entity = len(name_offsets) - 1
+                names += name.encode("utf-8")
+                name_offsets.append(len(names))
+                for fact in item_facts:
+                    facts.write(fact.encode("utf-8"))
+                    fact_offsets.append(facts.tell())
+                fact_start.append(len(fact_offsets) - 1)
+                aliases = {tuple(vocab.setdefault(t, len(vocab)) for t in tokenize(alias))
+                           for alias in [name, *item_aliases]}
+                keys.extend((alias, entity) for alias in aliases if alias)
+        keys.sort()
+
+        # 按排序后的别名构建trie：节点按先序编号，同一父节点的子节点按token_id升序产生
+        parent, label, depth = array.array("I", [0]), array.array("I", [0]), array.array("I", [0])
+        out_node, out_entity = array.array("I"), array.array("I")
+        path, prev = [0], ()
+        for key, entity in keys:
+            common = 0
+            for a, b in zip(prev, key):
+                if a != b:
+                    break
+                common += 1
+            del path[common + 1:]
+            for token in key[common:]:
+                parent.append(path[-1])
+                label.append(token)
+                depth.append(len(path))
+                path.append(len(parent) - 1)
+            if key != prev or not out_entity or out_entity[-1] != entity:
+                out_node.append(path[-1])
+                out_entity.append(entity)
+            prev = key
+        del keys
+        n_nodes = len(parent)
+
+        edge_start = array.array("I", bytes(4 * (n_nodes + 1)))
+        for node in range(1, n_nodes):
+            edge_start[parent[node] + 1] += 1
+        for node in range(n_nodes):
+            edge_start[node + 1] += edge_start[node]
+        edge_label = array.array("I", bytes(4 * (n_nodes - 1)))
+        edge_target = array.array("I", bytes(4 * (n_nodes - 1)))
+        fill = array.array("I", edge_start)
+        root_goto = array.array("I", bytes(4 * len(vocab)))
+        by_depth: List[List[int]] = []
+        for node in range(1, n_nodes):
+            p = parent[node]
+            edge_label[fill[p]] = label[node]
+            edge_target[fill[p]] = node
+            fill[p] += 1
+            if p == 0:
+                root_goto[label[node]] = node
+            d = depth[node]
+            if d > len(by_depth):
+                by_depth.append([])
+            by_depth[d - 1].append(node)
+        del fill
+
+        def goto(node: int, token: int) -> int:
+            if node == 0:
+                return root_goto[token]
+            lo, hi = edge_start[node], edge_start[node + 1]
+            i = bisect.bisect_left(edge_label, token, lo, hi)
+            return edge_target[i] if i < hi and edge_label[i] == token else 0
+
+        out_start = array.array("I", bytes(4 * (n_nodes + 1)))
+        for node in out_node:
+            out_start[node + 1] += 1
+        for node in range(n_nodes):
+            out_start[node + 1] += out_start[node]
+        del out_node
+
+        # 按深度（BFS顺序）计算失败指针与输出链接
+        fail = array.array("I", bytes(4 * n_nodes))
+        dict_link = array.array("I", bytes(4 * n_nodes))
+        for level in by_depth[1:]:
+            for node in level:
+                token, f = label[node], fail[parent[node]]
+                while True:
+                    target = goto(f, token)
+                    if target or f == 0:
+                        break
+                    f = fail[f]
+                fail[node] = target
+                dict_link[node] = target if out_start[target + 1] > out_start[target] else dict_link[target]
+        del by_depth, parent, label
+
+        mask = 1
+        while mask < 2 * len(vocab):
+            mask <<= 1
+        vocab_slots = array.array("I", bytes(4 * mask))
+        mask -= 1
+        token_offsets, token_bytes = array.array("Q", [0]), bytearray()
+        for token in vocab:  # dict按插入顺序遍历，即token_id顺序
+            data = token.encode("utf-8")
+            i = _slot(data, mask)
+            while vocab_slots[i]:
+                i = (i + 1) & mask
+            vocab_slots[i] = len(token_offsets)
+            token_bytes += data
+            token_offsets.append(len(token_bytes))
+        del vocab
+
+        sections = dict(vocab_slots=vocab_slots, token_offsets=token_offsets, token_bytes=token_bytes,
+                        root_goto=root_goto, edge_start=edge_start, edge_label=edge_label,
+                        edge_target=edge_target, fail=fail, dict_link=dict_link, depth=depth,
+                        out_start=out_start, out_entity=out_entity, name_offsets=name_offsets,
+                        name_bytes=names, fact_start=fact_start, fact_offsets=fact_offsets, fact_bytes=facts)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(index_path)), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                writer = _SectionWriter(out)
+                out.write(bytes(_HEADER.size + _SECTION.size * len(_SECTIONS)))
+                for name, _ in _SECTIONS:
+                    writer.write(name, sections[name])
+                out.seek(0)
+                out.write(_HEADER.pack(_MAGIC, _VERSION, len(_SECTIONS)))
+                for name, _ in _SECTIONS:
+                    out.write(_SECTION.pack(*writer.table[name]))
+            os.replace(tmp, index_path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    finally:
+        facts.close()
+    return index_path
+
+
+class LocalKB:
+    """内存映射的本地知识库：Aho-Corasick自动机匹配查询中的实体，再经倒排表取出事实。
+
+    查询耗时只与查询长度（和命中的事实数）有关，与知识库规模无关；
+    索引以只读方式mmap，多个worker进程打开同一文件时共享同一份页缓存。
+    """
+
+    def __init__(self, index_path: str):
+        self.path = index_path
+        with open(index_path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = _HEADER.unpack_from(self._mm)
+        if magic != _MAGIC or version != _VERSION or count != len(_SECTIONS):
+            self._mm.close()
+            raise ValueError(f"{index_path}不是当前版本的知识库索引，请重新执行build_index")
+        view = memoryview(self._mm)
+        self._views = []
+        for i, (name, code) in enumerate(_SECTIONS):
+            start, length = _SECTION.unpack_from(self._mm, _HEADER.size + i * _SECTION.size)
+            section = view[start:start + length]
+            if code != "B":
+                section = section.cast(code)
+            self._views.append(section)
+            setattr(self, "_" + name, section)
+        self._views.append(view)
+        self._mask = len(self._vocab_slots) - 1
+
+    @classmethod
+    def load(cls, source: str, index_path: Optional[str] = None) -> "LocalKB":
+        """必要时先重建索引，再打开"""
+        return cls(build_index(source, index_path))
+
+    def close(self) -> None:
+        for section in reversed(self._views):
+            section.release()
+        self._views = []
+        self._mm.close()
+
+    def __enter__(self) -> "LocalKB":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._name_offsets) - 1
+
+    def name(self, entity: int) -> str:
+        return str(self._name_bytes[self._name_offsets[entity]:self._name_offsets[entity + 1]], "utf-8")
+
+    def facts(self, entity: int) -> List[str]:
+        offsets, data = self._fact_offsets, self._fact_bytes
+        return [str(data[offsets[i]:offsets[i + 1]], "utf-8")
+                for i in range(self._fact_start[entity], self._fact_start[entity + 1])]
+
+    def _token_id(self, token: str) -> int:
+        data = token.encode("utf-8")
+        slots, offsets, mask = self._vocab_slots, self._token_offsets, self._mask
+        i = _slot(data, mask)
+        while slots[i]:
+            token_id = slots[i] - 1
+            if self._token_bytes[offsets[token_id]:offsets[token_id + 1]] == data:
+                return token_id
+            i = (i + 1) & mask
+        return -1
+
+    def _goto(self, node: int, token: int) -> int:
+        if node == 0:
+            return self._root_goto[token]
+        lo, hi = self._edge_start[node], self._edge_start[node + 1]
+        i = bisect.bisect_left(self._edge_label, token, lo, hi)
+        return self._edge_target[i] if i < hi and self._edge_label[i] == token else 0
+
+    def match(self, query: str) -> List[Tuple[int, int, int]]:
+        """返回查询中全部别名命中：(起始token, 结束token, 实体编号)，可能相互重叠"""
+        out_start, out_entity = self._out_start, self._out_entity
+        found = []
+        state = 0
+        for pos, token in enumerate(tokenize(query)):
+            token_id = self._token_id(token)
+            if token_id < 0:  # 词表外的token不会出现在任何别名中
+                state = 0
+                continue
+            while True:
+                target = self._goto(state, token_id)
+                if target or state == 0:
+                    break
+                state = self._fail[state]
+            state = target
+            node = state if out_start[state + 1] > out_start[state] else self._dict_link[state]
+            while node:
+                begin = pos + 1 - self._depth[node]
+                for i in range(out_start[node], out_start[node + 1]):
+                    found.append((begin, pos + 1, out_entity[i]))
+                node = self._dict_link[node]
+        return found
+
+    def entities(self, query: str) -> List[Tuple[int, int, int]]:
+        """取最左最长且互不重叠的命中；同一区间对应多个实体（同名别名）时全部保留"""
+        chosen: List[Tuple[int, int, int]] = []
+        for begin, end, entity in sorted(self.match(query), key=lambda m: (m[0], m[0] - m[1], m[2])):
+            if not chosen or begin >= chosen[-1][1]:
+                chosen.append((begin, end, entity))
+            elif (begin, end) == chosen[-1][:2] and entity != chosen[-1][2]:
+                chosen.append((begin, end, entity))
+        return chosen
+
+    def lookup(self, query: str, max_entities: int = 3, max_facts: int = 3) -> List[Tuple[str, List[str]]]:
+        """返回[(实体名, 事实列表)]；与查询中其余关键词重合多的事实排在前面"""
+        tokens = tokenize(query)
+        hits, seen = [], set()
+        for begin, end, entity in self.entities(query):
+            if entity not in seen:
+                seen.add(entity)
+                hits.append(entity)
+            tokens[begin:end] = [None] * (end - begin)
+        keywords = {t for t in tokens if t is not None and t not in _STOPWORDS}
+        results = []
+        for entity in hits[:max_entities]:
+            facts = self.facts(entity)
+            if keywords:
+                facts.sort(key=lambda fact: -len(keywords.intersection(tokenize(fact))))
+            results.append((self.name(entity), facts[:max_facts]))
+        return results
+
+    def answer(self, query: str) -> str:
+        results = self.lookup(query)
+        if not results:
+            return NOT_FOUND
+        if len(results) == 1:
+            return " ".join(results[0][1])
+        return "\n".join(f"{name}: {' '.join(facts)}" for name, facts in results)
+
+
+def kb_tool(kb: LocalKB, name: str = "wiki_tool",
+            description: str = "Search simple encyclopedia facts.") -> BaseTool:
+    """以知识库实现的工具，名称与参数和原wiki_tool一致，可直接替换"""
+    def search(query: str) -> str:
+        return kb.answer(query)
+    return StructuredTool.from_function(search, name=name, description=description)
+
+
+def write_kb(path: str, entities: Iterable[dict]) -> None:
+    """按build_index所需格式写出JSONL知识库"""
+    with open(path, "w", encoding="utf-8") as f:
+        for item in entities:
+            f.write(json.dumps(item, ensure_ascii=False) + "\n")
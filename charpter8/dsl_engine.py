@@ -0,0 +1,415 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple, get_type_hints
+
+import yaml
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from langgraph.errors import GraphRecursionError, InvalidUpdateError
+from langgraph.graph import StateGraph, END
+
+DSL_END = "END"
+DEFAULT_BRANCH_KEY = "decision"
+DEFAULT_MAP_CONCURRENCY = 4
+_END_INDEX = -1
+
+# parallel子节点与map元素分别使用独立的线程池（按需创建）：
+# parallel子节点可以是map节点，共用一个池在高并发时会因互相等待而死锁
+_POOL_SIZE = 32
+_pools: Dict[str, ThreadPoolExecutor] = {}
+_pool_lock = threading.Lock()
+
+
+def _target(name: str) -> str:
+    return END if name == DSL_END else name
+
+
+def _get_pool(kind: str) -> ThreadPoolExecutor:
+    pool = _pools.get(kind)
+    if pool is None:
+        with _pool_lock:
+            pool = _pools.get(kind)
+            if pool is None:
+                pool = _pools[kind] = ThreadPoolExecutor(max_workers=_POOL_SIZE,
+                                                         thread_name_prefix=f"dsl-{kind}")
+    return pool
+
+
+def _bounded_map(func: Callable[[Any], Any], items: List[Any], limit: int) -> List[Any]:
+    """并发执行func(item)，同时运行的任务不超过limit个，结果按输入顺序返回"""
+    pool = _get_pool("map")
+    results: List[Any] = [None] * len(items)
+    pending: Dict[Future, int] = {}
+    todo = iter(enumerate(items))
+
+    def submit_next() -> None:
+        for i, item in todo:
+            pending[pool.submit(func, item)] = i
+            return
+
+    for _ in range(max(1, limit)):
+        submit_next()
+    try:
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[pending.pop(future)] = future.result()
+                submit_next()
+    finally:
+        for future in pending:
+            future.cancel()
+    return results
+
+
+def _map_node(info: Dict[str, Any], registry: Dict[str, Callable]) -> Callable:
+    """map节点：对state[items]中的每个元素调用注册函数，结果列表写入state[result]"""
+    func = registry[info["map"]]
+    items_key, result_key = info["items"], info["result"]
+    limit = info.get("max_concurrency", DEFAULT_MAP_CONCURRENCY)
+
+    def run(state: Dict[str, Any]) -> Dict[str, Any]:
+        return {result_key: _bounded_map(func, list(state[items_key] or []), limit)}
+
+    return run
+
+
+def _parallel_node(children: List[str], funcs: List[Callable]) -> Callable:
+    """parallel节点（轻量引擎）：并发执行所有子节点并合并更新，同一字段被多个子节点写入时报错"""
+    def run(state: Dict[str, Any]) -> Dict[str, Any]:
+        pool = _get_pool("parallel")
+        futures = [pool.submit(func, state) for func in funcs]
+        merged: Dict[str, Any] = {}
+        writers: Dict[str, str] = {}
+        for child, future in zip(children, futures):
+            for key, value in (future.result() or {}).items():
+                if key in writers:
+                    raise InvalidUpdateError(f"并行节点{writers[key]}与{child}同时写入了字段{key}")
+                writers[key] = child
+                merged[key] = value
+        return merged
+
+    return run
+
+
+def _node_callable(info: Dict[str, Any], registry: Dict[str, Callable]) -> Callable:
+    return _map_node(info, registry) if "map" in info else registry[info["func"]]
+
+
+def _passthrough(state: Dict[str, Any]) -> Dict[str, Any]:
+    return {}
+
+
+def _parallel_children(dsl: Dict[str, Any]) -> Dict[str, str]:
+    """并行子节点 -> 所属parallel节点"""
+    return {child: name for name, info in dsl["nodes"].items() for child in info.get("parallel", [])}
+
+
+def build_graph_from_dsl(dsl: Dict[str, Any], registry: Dict[str, Callable], state_schema: type) -> Any:
+    """LangGraph执行引擎：根据DSL构建并编译StateGraph（与exp8-7的构建器一致）。
+
+    branch节点按state[branch_key]（默认"decision"）的值选择下一个节点。
+    parallel节点编译为扇出节点 + 汇合边：所有子节点在同一步内并发执行，全部完成后进入next；
+    map节点在节点内部用线程池并发处理列表元素。
+    """
+    graph = StateGraph(state_schema)
+    for node_name, node_info in dsl["nodes"].items():
+        if "parallel" in node_info:
+            runnable = RunnableLambda(_passthrough, name=node_name)
+        elif "map" in node_info:
+            runnable = RunnableLambda(_node_callable(node_info, registry), name=node_name)
+        else:
+            runnable = RunnableLambda(registry[node_info["func"]])
+        graph.add_node(node_name, runnable)
+
+    for node_name, node_info in dsl["nodes"].items():
+        if "parallel" in node_info:
+            children = node_info["parallel"]
+            for child in children:
+                graph.add_edge(node_name, child)
+            if node_info["next"] == DSL_END:
+                for child in children:
+                    graph.add_edge(child, END)
+            else:
+                graph.add_edge(children, node_info["next"])
+        elif "next" in node_info:
+            graph.add_edge(node_name, _target(node_info["next"]))
+        elif "branch" in node_info:
+            key = node_info.get("branch_key", DEFAULT_BRANCH_KEY)
+            graph.add_conditional_edges(
+                node_name,
+                lambda state, key=key: state[key],
+                {value: _target(target) for value, target in node_info["branch"].items()}
+            )
+
+    graph.set_entry_point(dsl["entry"])
+    return graph.compile()
+
+
+# 与LangGraph的默认步数上限保持一致（同样可通过该环境变量修改）
+DEFAULT_RECURSION_LIMIT = int(os.getenv("LANGGRAPH_DEFAULT_RECURSION_LIMIT", "10000"))
+
+
+class FastWorkflow:
+    """轻量执行引擎：将DSL编译为扁平的分发表，按表逐步执行节点函数。
+
+    节点按编号存储：funcs[i]为节点函数，next_table[i]为下一节点编号（-1表示结束），
+    branch_table[i]为(分支字段, 取值 -> 节点编号)。parallel与map节点预先包装为单个函数，
+    在共享线程池中并发执行。执行语义与LangGraph路径保持一致：
+    节点返回的字段覆盖写入状态，结果只包含被写入过的字段，超过步数上限抛出GraphRecursionError。
+    步数按LangGraph的超步计算：普通节点1步，parallel节点2步（汇合前的分发节点与并发的子节点各1步）。
+    适用于由纯函数组成的线性/分支流程，不支持checkpoint、中断与流式输出。
+    """
+
+    def __init__(self, dsl: Dict[str, Any], registry: Dict[str, Callable],
+                 state_schema: Optional[type] = None, recursion_limit: Optional[int] = None):
+        names: List[str] = list(dsl["nodes"])
+        index = {name: i for i, name in enumerate(names)}
+        index[DSL_END] = _END_INDEX
+
+        self.names = names
+        self.entry = index[dsl["entry"]]
+        self.recursion_limit = recursion_limit or DEFAULT_RECURSION_LIMIT
+        self.keys = frozenset(get_type_hints(state_schema)) if state_schema else None
+        self.funcs: List[Callable] = []
+        self.next_table: List[Optional[int]] = []
+        self.branch_table: List[Optional[Tuple[str, Dict[Any, int]]]] = []
+        self.step_costs: List[int] = []
+        children = _parallel_children(dsl)
+        for name in names:
+            info = dsl["nodes"][name]
+            if "parallel" in info:
+                funcs = [_node_callable(dsl["nodes"][child], registry) for child in info["parallel"]]
+                self.funcs.append(_parallel_node(info["parallel"], funcs))
+                self.step_costs.append(2)
+            else:
+                self.funcs.append(_node_callable(info, registry))
+                self.step_costs.append(1)
+
+            if name in children:
+                # 并行子节点只在所属parallel节点内执行，不参与跳转
+                self.next_table.append(None)
+                self.branch_table.append(None)
+            elif "next" in info:
+                self.next_table.append(index[info["next"]])
+                self.branch_table.append(None)
+            elif "branch" in info:
+                self.next_table.append(None)
+                self.branch_table.append((info.get("branch_key", DEFAULT_BRANCH_KEY),
+                                          {value: index[target] for value, target in info["branch"].items()}))
+            else:
+                raise ValueError(f"节点{name}缺少next或branch")
+
+    def invoke(self, inputs: Dict[str, Any], config: Optional[RunnableConfig] = None) -> Dict[str, Any]:
+        """config中只使用recursion_limit，含义与LangGraph相同"""
+        limit = (config or {}).get("recursion_limit") or self.recursion_limit
+        keys = self.keys
+        state = {k: v for k, v in inputs.items() if keys is None or k in keys}
+        funcs, next_table, branch_table, step_costs = self.funcs, self.next_table, self.branch_table, self.step_costs
+        node = self.entry
+        steps = 0
+        while node != _END_INDEX:
+            steps += step_costs[node]
+            if steps >= limit:  # LangGraph在执行步数达到上限时即报错
+                raise GraphRecursionError(f"超过步数上限{limit}，流程未结束")
+            update = funcs[node](state)
+            if update:
+                if keys is None:
+                    state.update(update)
+                else:
+                    state.update((k, v) for k, v in update.items() if k in keys)
+            nxt = next_table[node]
+            if nxt is None:
+                key, table = branch_table[node]
+                value = state[key]
+                if value not in table:
+                    raise ValueError(f"节点{self.names[node]}的分支取值{value!r}未定义")
+                nxt = table[value]
+            node = nxt
+        return state
+
+
+def compile_dsl_fast(dsl: Dict[str, Any], registry: Dict[str, Callable],
+                     state_schema: Optional[type] = None, recursion_limit: Optional[int] = None) -> FastWorkflow:
+    return FastWorkflow(dsl, registry, state_schema, recursion_limit)
+
+
+def load_dsl(path: str) -> Dict[str, Any]:
+    """从JSON或YAML文件读取DSL定义"""
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, "r", encoding="utf-8") as f:
+        if ext == ".json":
+            return json.load(f)
+        if ext in (".yaml", ".yml"):
+            return yaml.safe_load(f)
+    raise ValueError(f"不支持的DSL文件格式：{path}")
+
+
+def _non_string_keys(value: Any, path: str = "dsl") -> List[str]:
+    # YAML中的1:、true:等会被解析为非字符串键，既无法作为节点名也无法参与JSON规范化哈希
+    if isinstance(value, dict):
+        found = [f"{path}中的键{key!r}必须是字符串" for key in value if not isinstance(key, str)]
+        for key, item in value.items():
+            found += _non_string_keys(item, f"{path}.{key}")
+        return found
+    if isinstance(value, list):
+        return [error for i, item in enumerate(value) for error in _non_string_keys(item, f"{path}[{i}]")]
+    return []
+
+
+def _check_string_keys(dsl: Dict[str, Any]) -> None:
+    errors = _non_string_keys(dsl)
+    if errors:
+        raise ValueError("DSL校验失败：\n" + "\n".join(errors))
+
+
+def validate_dsl(dsl: Dict[str, Any], registry: Dict[str, Callable]) -> Dict[str, Any]:
+    """校验DSL结构，发现问题时一次性列出全部错误。
+
+    节点类型：func（普通节点）、map（对列表逐元素调用，需声明items与result）、
+    parallel（并发执行一组子节点后进入next）。parallel的子节点可以是func或map节点，不能声明跳转。
+    """
+    _check_string_keys(dsl)
+    errors: List[str] = []
+    nodes = dsl.get("nodes")
+    if not isinstance(nodes, dict) or not nodes:
+        raise ValueError("DSL缺少nodes定义")
+    if dsl.get("entry") not in nodes:
+        errors.append(f"入口节点{dsl.get('entry')!r}不存在")
+
+    children: Dict[str, str] = {}
+    for name, info in nodes.items():
+        for child in info.get("parallel") or []:
+            if child in children:
+                errors.append(f"节点{child}同时属于并行节点{children[child]}与{name}")
+            children[child] = name
+    if dsl.get("entry") in children:
+        errors.append(f"入口节点{dsl['entry']}不能是并行子节点")
+
+    for name, info in nodes.items():
+        kinds = [kind for kind in ("func", "map", "parallel") if kind in info]
+        if len(kinds) != 1:
+            errors.append(f"节点{name}必须且只能声明func、map或parallel之一")
+        if "func" in info and info["func"] not in registry:
+            errors.append(f"节点{name}引用了未注册的函数{info['func']!r}")
+        if "map" in info:
+            if info["map"] not in registry:
+                errors.append(f"节点{name}引用了未注册的函数{info['map']!r}")
+            if "items" not in info or "result" not in info:
+                errors.append(f"map节点{name}必须声明items与result")
+        if "parallel" in info:
+            if not isinstance(info["parallel"], list) or not info["parallel"]:
+                errors.append(f"parallel节点{name}的子节点列表为空")
+            for child in info["parallel"] or []:
+                if child not in nodes:
+                    errors.append(f"parallel节点{name}引用了不存在的节点{child!r}")
+                elif "parallel" in nodes[child]:
+                    errors.append(f"并行子节点{child}不能是parallel节点")
+            if "next" not in info or "branch" in info:
+                errors.append(f"parallel节点{name}必须且只能声明next")
+
+        if name in children:
+            if "next" in info or "branch" in info:
+                errors.append(f"并行子节点{name}不能声明next或branch")
+            continue
+        if ("next" in info) == ("branch" in info):
+            errors.append(f"节点{name}必须且只能声明next或branch之一")
+        targets = [info["next"]] if "next" in info else list((info.get("branch") or {}).values())
+        if "branch" in info and not info["branch"]:
+            errors.append(f"节点{name}的branch为空")
+        for target in targets:
+            if target != DSL_END and target not in nodes:
+                errors.append(f"节点{name}指向不存在的节点{target!r}")
+            elif target in children:
+                errors.append(f"节点{name}不能直接跳转到并行子节点{target}")
+    if errors:
+        raise ValueError("DSL校验失败：\n" + "\n".join(errors))
+    return dsl
+
+
+def dsl_hash(dsl: Dict[str, Any]) -> str:
+    """DSL内容哈希：与键顺序、格式（JSON/YAML）无关；存在非字符串键时抛出ValueError"""
+    _check_string_keys(dsl)
+    canonical = json.dumps(dsl, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def registry_version(registry: Dict[str, Callable]) -> str:
+    """函数注册表版本：注册名或注册的函数对象变化时版本随之变化。
+
+    包含函数对象的id，同名的工厂函数、闭包或lambda被替换后版本也会变化；因此版本只在本进程内有效。
+    """
+    items = sorted(
+        f"{name}={getattr(func, '__module__', '')}.{getattr(func, '__qualname__', repr(func))}@{id(func):x}"
+        for name, func in registry.items()
+    )
+    return hashlib.sha256("\n".join(items).encode("utf-8")).hexdigest()[:16]
+
+
+class DSLGraphCache:
+    """已编译工作流的进程内缓存。
+
+    以"DSL内容哈希 + 函数注册表版本"为键，命中时直接复用编译结果，只在首次出现时校验并编译；
+    缓存数量超过maxsize时按LRU淘汰。未指定version时每次查询都按当前注册表计算版本，
+    注册表中的函数被替换后不会再命中按旧函数编译的结果。DSL文件按路径、修改时间与大小缓存解析结果，避免重复读取。
+    """
+
+    def __init__(self, registry: Dict[str, Callable], state_schema: type, maxsize: int = 1024,
+                 engine: Literal["langgraph", "fast"] = "langgraph", version: Optional[str] = None):
+        self.registry = registry
+        self.state_schema = state_schema
+        self.maxsize = maxsize
+        self.engine = engine
+        self._version = version
+        self._graphs: "OrderedDict[Tuple[str, str, str], Any]" = OrderedDict()
+        self._files: "OrderedDict[str, Tuple[Tuple[int, int], Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @property
+    def version(self) -> str:
+        return self._version or registry_version(self.registry)
+
+    def _compile(self, dsl: Dict[str, Any]) -> Any:
+        validate_dsl(dsl, self.registry)
+        if self.engine == "fast":
+            return compile_dsl_fast(dsl, self.registry, self.state_schema)
+        return build_graph_from_dsl(dsl, self.registry, self.state_schema)
+
+    def get(self, dsl: Dict[str, Any]) -> Any:
+        key = (dsl_hash(dsl), self.version, self.engine)
+        with self._lock:
+            if key in self._graphs:
+                self._graphs.move_to_end(key)
+                self.stats["hits"] += 1
+                return self._graphs[key]
+        graph = self._compile(dsl)  # 编译放在锁外，避免阻塞其他租户
+        with self._lock:
+            self.stats["misses"] += 1
+            self._graphs[key] = graph
+            self._graphs.move_to_end(key)
+            while len(self._graphs) > self.maxsize:
+                self._graphs.popitem(last=False)
+                self.stats["evictions"] += 1
+            return self._graphs[key]
+
+    def load(self, path: str) -> Any:
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        file_key = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._files.get(path)
+            if cached and cached[0] == file_key:
+                self._files.move_to_end(path)
+                dsl = cached[1]
+            else:
+                dsl = None
+        if dsl is None:
+            dsl = load_dsl(path)
+            with self._lock:
+                self._files[path] = (file_key, dsl)
+                while len(self._files) > self.maxsize:
+                    self._files.popitem(last=False)
+        return self.get(dsl)
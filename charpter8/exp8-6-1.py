@@ -0,0 +1,54 @@
+import os
+import time
+from typing import TypedDict
+from langchain_core.runnables import RunnableLambda
+from langgraph.graph import StateGraph
+from plugin_index import PluginRegistry, lazy_plugin_node
+
+# 定义状态结构
+class WorkflowState(TypedDict):
+    input: str
+    output: str
+
+# 主图定义：插件节点在首次执行时才导入并编译对应子图
+def build_main_graph(registry: PluginRegistry, plugin_names):
+    graph = StateGraph(WorkflowState)
+
+    def preprocess(state: WorkflowState) -> WorkflowState:
+        return {"input": state["input"], "output": ""}
+
+    def postprocess(state: WorkflowState) -> WorkflowState:
+        return {"input": state["input"], "output": f"最终输出:{state['output']}"}
+
+    graph.add_node("preprocess", RunnableLambda(preprocess))
+    for plugin_name in plugin_names:
+        graph.add_node(plugin_name, lazy_plugin_node(registry, plugin_name))
+    graph.add_node("postprocess", RunnableLambda(postprocess))
+
+    # 构建流程图：预处理 ->插件1 ->插件2 ->后处理
+    graph.set_entry_point("preprocess")
+    previous = "preprocess"
+    for plugin_name in plugin_names:
+        graph.add_edge(previous, plugin_name)
+        previous = plugin_name
+    graph.add_edge(previous, "postprocess")
+    graph.set_finish_point("postprocess")
+    return graph
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+plugin_dir_path = os.path.join(current_dir, "plugins")
+
+# 启动：只读取（必要时增量更新）插件索引，不导入任何插件
+start = time.perf_counter()
+registry = PluginRegistry(plugin_dir_path)
+print(f"索引加载耗时：{(time.perf_counter() - start) * 1000:.2f} ms，可用插件：{list(registry)}")
+for name, entry in registry.entries.items():
+    print(f"  {name}: 入口={entry['entry_point']} 状态={entry['state_schema']} sha256={entry['sha256'][:12]}")
+
+app = build_main_graph(registry, list(registry)).compile()
+print("编译主图后已导入插件：", registry.loaded())
+
+# 测试输入执行：插件在首次执行时加载
+result = app.invoke({"input": "42"})
+print(result)
+print("执行后已导入插件：", registry.loaded())
@@ -0,0 +1,36 @@
+import os
+import time
+from langchain_core.runnables import RunnableLambda
+from plugin_index import PluginRegistry
+from plugin_dag import build_dag_graph, plan_plugin_dag
+
+# 初始处理与最终整理节点
+def preprocess(state: dict) -> dict:
+    return {"input": state["input"], "output": ""}
+
+def postprocess(state: dict) -> dict:
+    return {"input": state["input"], "output": f"最终输出:{state['output']}"}
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+registry = PluginRegistry(os.path.join(current_dir, "plugins"))
+
+# 依赖规划：插件名 -> 前置插件
+plan = plan_plugin_dag(registry.entries)
+print("插件依赖：", plan)
+
+app = build_dag_graph(registry, preprocess, postprocess).compile()
+result = app.invoke({"input": "42"})
+print({"input": result["input"], "output": result["output"]})
+
+# 模拟每个插件存在0.5秒的外部调用延迟，对比串行执行与按依赖并发执行的端到端耗时
+def slow_resolve(name, config):
+    def run(state):
+        time.sleep(0.5)
+        return registry.compiled(name).invoke(state)
+    return RunnableLambda(run)
+
+slow_app = build_dag_graph(registry, preprocess, postprocess, resolve=slow_resolve).compile()
+start = time.perf_counter()
+slow_result = slow_app.invoke({"input": "42"})
+print(f"按依赖并发执行耗时：{time.perf_counter() - start:.2f}s（串行约需{0.5 * len(plan):.2f}s）")
+assert slow_result["output"] == result["output"], "并发执行结果与预期不一致"
@@ -0,0 +1,49 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+from plugin_index import PluginRegistry
+from plugin_dag import build_dag_graph
+from plugin_hot_reload import HotReloadPluginHost
+
+def preprocess(state: dict) -> dict:
+    time.sleep(0.5)  # 模拟耗时的预处理，便于观察运行中的请求
+    return {"input": state["input"], "output": ""}
+
+def postprocess(state: dict) -> dict:
+    return {"input": state["input"], "output": f"最终输出:{state['output']}"}
+
+def build_main(registry, resolve, resolve_entry):
+    return build_dag_graph(registry, preprocess, postprocess, resolve=resolve, resolve_entry=resolve_entry)
+
+# 复制一份插件目录用于演示，避免修改示例源码
+current_dir = os.path.dirname(os.path.abspath(__file__))
+work_dir = tempfile.mkdtemp()
+plugin_dir = os.path.join(work_dir, "plugins")
+shutil.copytree(os.path.join(current_dir, "plugins"), plugin_dir,
+                ignore=shutil.ignore_patterns("__pycache__"))
+
+host = HotReloadPluginHost(PluginRegistry(plugin_dir), build_main, poll_interval=0.2)
+host.start()
+print("初始版本：", host.invoke({"input": "42"})["output"])
+
+# 启动一个运行中的请求，随后修改插件文件
+in_flight = {}
+worker = threading.Thread(target=lambda: in_flight.update(host.invoke({"input": "42"})))
+worker.start()
+time.sleep(0.1)
+
+translate_path = os.path.join(plugin_dir, "plugin_translate.py")
+with open(translate_path, "r", encoding="utf-8") as f:
+    source = f.read()
+with open(translate_path, "w", encoding="utf-8") as f:
+    f.write(source.replace("模拟翻译为目标语言", "翻译为英文（v2）"))
+
+time.sleep(1.0)  # 等待文件监听线程完成热更新
+worker.join()
+print("运行中请求（旧版本）：", in_flight["output"])
+print("新请求（新版本）：", host.invoke({"input": "42"})["output"])
+
+host.stop()
+shutil.rmtree(work_dir)
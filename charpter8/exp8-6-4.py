@@ -0,0 +1,34 @@
+import os
+import time
+from plugin_index import PluginRegistry
+from plugin_dag import build_dag_graph
+from plugin_workers import PluginWorkerPool, PluginCrashedError
+
+def preprocess(state: dict) -> dict:
+    return {"input": state["input"], "output": ""}
+
+def postprocess(state: dict) -> dict:
+    return {"input": state["input"], "output": f"最终输出:{state['output']}"}
+
+# worker进程以spawn方式启动会重新导入本模块，执行逻辑必须放在main保护内
+if __name__ == "__main__":
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    registry = PluginRegistry(os.path.join(current_dir, "plugins"))
+
+    # 每个插件2个worker进程，翻译插件单独限制为1个
+    start = time.perf_counter()
+    pool = PluginWorkerPool(registry, workers_per_plugin=2, plugin_workers={"plugin_translate": 1})
+    print(f"worker进程启动耗时：{time.perf_counter() - start:.2f}s")
+
+    app = build_dag_graph(registry, preprocess, postprocess, resolve=pool.resolve).compile()
+    print(app.invoke({"input": "42"})["output"])
+
+    # 模拟插件worker崩溃：宿主与其他插件不受影响，退出的worker会被自动替换
+    for worker in list(pool._all["plugin_math"]):
+        worker.process.kill()
+    try:
+        print("崩溃后调用：", app.invoke({"input": "7"})["output"])
+    except PluginCrashedError as e:
+        print(f"调用失败：{e}")
+
+    pool.close()
@@ -31,6 +31,9 @@ def create_plugin_graph(name: str) -> Callable[[], StateGraph]:
 def load_plugin_modules(plugin_dir: str) -> Dict[str, Callable[[], StateGraph]]:
     plugin_graphs = {}
     for file in os.listdir(plugin_dir):
+        # 只加载Python源文件，跳过__pycache__、索引等其他文件
+        if not file.endswith(".py") or file.startswith(("_", ".")):
+            continue
         path = os.path.join(plugin_dir, file)
         module_name = os.path.splitext(file)[0]
         spec = importlib.util.spec_from_file_location(module_name, path)
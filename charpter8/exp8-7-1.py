@@ -0,0 +1,74 @@
+from typing import TypedDict, Union, Callable, Dict
+from dsl_engine import build_graph_from_dsl, compile_dsl_fast
+import timeit
+
+# 定义图状态类型
+class WorkflowState(TypedDict):
+    input: str
+    summary: Union[str, None]
+    decision: Union[str, None]
+    output: Union[str, None]
+
+# 处理函数（与exp8-7相同）
+def summarize_node(state: WorkflowState) -> Dict:
+    text = state["input"]
+    summary = text[:50] +"..." if len(text)>50 else text
+    return {"summary": summary}
+
+def decision_node(state: WorkflowState) -> Dict:
+    if "error" in state["summary"].lower():
+        return {"decision": "handler_error"}
+    return {"decision": "generate_output"}
+
+def error_handler_node(state: WorkflowState) -> Dict:
+    return {"output": f"错误处理完成：{state['summary']}"}
+
+def generate_output_node(state: WorkflowState) -> Dict:
+    return {"output": f"结果输出：{state['summary']}"}
+
+# 节点函数注册表
+FUNCTION_REGISTRY: Dict[str, Callable] = {
+    "summarize": summarize_node,
+    "decide": decision_node,
+    "error_handler": error_handler_node,
+    "output_generator": generate_output_node
+}
+
+# DSL定义
+graph_dsl = {
+    "entry": "summarize",
+    "nodes": {
+        "summarize": {"func": "summarize", "next": "decide"},
+        "decide": {
+            "func": "decide",
+            "branch": {
+                "handler_error": "error_handler",
+                "generate_output": "output_generator"
+            }
+        },
+        "error_handler": {"func": "error_handler", "next": "END"},
+        "output_generator": {"func": "output_generator", "next": "END"}
+    }
+}
+
+# 分别用两种引擎编译同一份DSL
+langgraph_workflow = build_graph_from_dsl(graph_dsl, FUNCTION_REGISTRY, WorkflowState)
+fast_workflow = compile_dsl_fast(graph_dsl, FUNCTION_REGISTRY, WorkflowState)
+
+inputs = [
+    {"input": "这是一个包含error关键字的一场摘要测试文本。"},
+    {"input": "这是一个正常的摘要测试文本，用于验证分支的另一条路径能够得到相同结果。"},
+]
+
+# 结果一致性校验
+for data in inputs:
+    expected = langgraph_workflow.invoke(data)
+    actual = fast_workflow.invoke(data)
+    assert actual == expected, f"结果不一致：{actual} != {expected}"
+    print(actual)
+
+# 单次运行开销基准
+rounds = 2000
+for name, workflow in (("LangGraph", langgraph_workflow), ("FastWorkflow", fast_workflow)):
+    elapsed = timeit.timeit(lambda: workflow.invoke(inputs[0]), number=rounds)
+    print(f"{name}：{elapsed / rounds * 1e6:.1f} µs/次")
@@ -0,0 +1,79 @@
+import os
+import random
+import time
+from typing import TypedDict, Union, Callable, Dict
+from dsl_engine import DSLGraphCache, load_dsl
+
+# 定义图状态类型
+class WorkflowState(TypedDict):
+    input: str
+    summary: Union[str, None]
+    decision: Union[str, None]
+    output: Union[str, None]
+
+# 处理函数（与exp8-7相同）
+def summarize_node(state: WorkflowState) -> Dict:
+    text = state["input"]
+    summary = text[:50] +"..." if len(text)>50 else text
+    return {"summary": summary}
+
+def decision_node(state: WorkflowState) -> Dict:
+    if "error" in state["summary"].lower():
+        return {"decision": "handler_error"}
+    return {"decision": "generate_output"}
+
+def error_handler_node(state: WorkflowState) -> Dict:
+    return {"output": f"错误处理完成：{state['summary']}"}
+
+def generate_output_node(state: WorkflowState) -> Dict:
+    return {"output": f"结果输出：{state['summary']}"}
+
+# 节点函数注册表
+FUNCTION_REGISTRY: Dict[str, Callable] = {
+    "summarize": summarize_node,
+    "decide": decision_node,
+    "error_handler": error_handler_node,
+    "output_generator": generate_output_node
+}
+
+workflow_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "workflows")
+cache = DSLGraphCache(FUNCTION_REGISTRY, WorkflowState, maxsize=512)
+
+# 从文件加载工作流：同一文件只在首次请求时解析、校验与编译
+for file_name in ("summarize_decide.yaml", "summarize_only.json"):
+    app = cache.load(os.path.join(workflow_dir, file_name))
+    print(file_name, app.invoke({"input": "这是一个包含error关键字的一场摘要测试文本。"}))
+print("缓存统计：", cache.stats)
+
+# 模拟多租户：每个租户一份DSL（此处只改动节点名），按请求随机选择租户
+base = load_dsl(os.path.join(workflow_dir, "summarize_decide.yaml"))
+
+def tenant_dsl(tenant: int) -> dict:
+    rename = lambda name: name if name == "END" else f"{name}_t{tenant}"
+    return {
+        "entry": rename(base["entry"]),
+        "nodes": {
+            rename(name): {
+                **info,
+                **({"next": rename(info["next"])} if "next" in info else {}),
+                **({"branch": {k: rename(v) for k, v in info["branch"].items()}} if "branch" in info else {}),
+            }
+            for name, info in base["nodes"].items()
+        },
+    }
+
+tenants = [tenant_dsl(i) for i in range(300)]
+random.seed(0)
+requests = [random.choice(tenants) for _ in range(3000)]
+
+# 对照：每次请求都重新校验并编译
+start = time.perf_counter()
+for dsl in requests[:300]:
+    cache._compile(dsl)
+print(f"每次编译：{(time.perf_counter() - start) / 300 * 1e6:.0f} µs/请求")
+
+# 带缓存：每个租户只编译一次，其余请求直接命中
+start = time.perf_counter()
+for dsl in requests:
+    cache.get(dsl)
+print(f"带缓存：{(time.perf_counter() - start) / len(requests) * 1e6:.0f} µs/请求，统计：{cache.stats}")
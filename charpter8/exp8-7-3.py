@@ -0,0 +1,69 @@
+import time
+from typing import TypedDict, List, Union, Callable, Dict
+from dsl_engine import build_graph_from_dsl, compile_dsl_fast, validate_dsl
+
+# 定义图状态类型
+class AnalyzeState(TypedDict):
+    input: str
+    chunks: List[str]
+    word_count: int
+    keywords: List[str]
+    translations: List[str]
+    output: Union[str, None]
+
+# 处理函数：用sleep模拟调用外部服务的耗时
+def split_node(state: AnalyzeState) -> Dict:
+    return {"chunks": [s for s in state["input"].split("。") if s]}
+
+def stats_node(state: AnalyzeState) -> Dict:
+    time.sleep(0.3)
+    return {"word_count": sum(len(c) for c in state["chunks"])}
+
+def keywords_node(state: AnalyzeState) -> Dict:
+    time.sleep(0.3)
+    return {"keywords": [c[:4] for c in state["chunks"]]}
+
+def translate_item(chunk: str) -> str:
+    time.sleep(0.2)
+    return f"[EN] {chunk}"
+
+def report_node(state: AnalyzeState) -> Dict:
+    return {"output": f"共{state['word_count']}字，关键词{state['keywords']}，译文{len(state['translations'])}段"}
+
+# 节点函数注册表
+FUNCTION_REGISTRY: Dict[str, Callable] = {
+    "split": split_node,
+    "stats": stats_node,
+    "keywords": keywords_node,
+    "translate_item": translate_item,
+    "report": report_node,
+}
+
+# DSL定义：analyze并发执行三个子节点，translate_all对每段文本并发翻译（最多4个同时进行）
+graph_dsl = {
+    "entry": "split",
+    "nodes": {
+        "split": {"func": "split", "next": "analyze"},
+        "analyze": {"parallel": ["stats", "keywords", "translate_all"], "next": "report"},
+        "stats": {"func": "stats"},
+        "keywords": {"func": "keywords"},
+        "translate_all": {"map": "translate_item", "items": "chunks", "result": "translations",
+                          "max_concurrency": 4},
+        "report": {"func": "report", "next": "END"},
+    }
+}
+
+inputs = {"input": "第一段内容。第二段内容。第三段内容。第四段内容。第五段内容。第六段内容。第七段内容。第八段内容"}
+
+# 串行执行作为对照：0.3 + 0.3 + 8 * 0.2 = 2.2s
+validate_dsl(graph_dsl, FUNCTION_REGISTRY)
+results = []
+for name, workflow in (("LangGraph", build_graph_from_dsl(graph_dsl, FUNCTION_REGISTRY, AnalyzeState)),
+                       ("FastWorkflow", compile_dsl_fast(graph_dsl, FUNCTION_REGISTRY, AnalyzeState))):
+    start = time.perf_counter()
+    results.append(workflow.invoke(inputs))
+    print(f"{name}：{time.perf_counter() - start:.2f}s（串行约2.2s）")
+
+assert results[0] == results[1], "两种引擎的结果不一致"
+print(results[0]["output"])
+print(results[0]["translations"])
@@ -0,0 +1,181 @@
+from typing import Annotated, Any, Callable, Dict, List, Optional, Sequence, TypedDict
+
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
+from langgraph.graph import StateGraph
+
+from plugin_index import PluginEntry, PluginRegistry
+
+# 根据插件名（与当前运行配置）取得可执行的插件子图
+Resolver = Callable[[str, RunnableConfig], Runnable]
+# 根据插件名（与当前运行配置）取得插件的索引条目（读写声明与状态结构）
+EntryResolver = Callable[[str, RunnableConfig], PluginEntry]
+
+
+def merge_fragments(left: Dict[str, Dict[str, Any]], right: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    return {**left, **right}
+
+
+# 主图状态：各插件的写入按插件名隔离在fragments中，并发分支之间不会互相覆盖
+class DagState(TypedDict):
+    input: str
+    output: str
+    fragments: Annotated[Dict[str, Dict[str, Any]], merge_fragments]
+
+
+def plan_plugin_dag(entries: Dict[str, PluginEntry], names: Optional[Sequence[str]] = None) -> Dict[str, List[str]]:
+    """根据插件的PLUGIN_META计算依赖：插件名 -> 前置插件列表（按拓扑序排列）。
+
+    PLUGIN_META可声明：
+    - reads：读取的状态字段
+    - writes：写入的状态字段
+    - after：必须先于本插件执行的插件名
+    插件B读取了插件A写入的字段时B依赖A，与插件名的先后无关；
+    两个插件互相读取对方写入的字段时构成循环，需用after显式指定顺序，否则报错。
+    同时写入同一字段的插件之间没有依赖，它们的结果由汇合节点按确定顺序合并。
+    """
+    names = sorted(names if names is not None else entries)
+    meta = {name: entries[name]["meta"] for name in names}
+    for name in names:
+        for dep in meta[name].get("after", []):
+            if dep not in meta:
+                raise ValueError(f"插件{name}依赖的插件{dep}不存在")
+    deps: Dict[str, List[str]] = {}
+    for name in names:
+        reads = set(meta[name].get("reads", []))
+        after = list(meta[name].get("after", []))
+        for writer in names:
+            if writer == name or writer in after or name in meta[writer].get("after", []):
+                continue  # 显式声明的after优先于按读写推断的依赖
+            if reads & set(meta[writer].get("writes", [])):
+                after.append(writer)
+        deps[name] = after
+
+    # 拓扑排序，同时检测循环依赖
+    order: List[str] = []
+    visiting, done = set(), set()
+
+    def visit(name: str) -> None:
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"插件存在循环依赖：{name}")
+        visiting.add(name)
+        for dep in deps[name]:
+            visit(dep)
+        visiting.discard(name)
+        done.add(name)
+        order.append(name)
+
+    for name in names:
+        visit(name)
+    return {name: sorted(deps[name], key=order.index) for name in order}
+
+
+def _ancestors(plan: Dict[str, List[str]], name: str) -> List[str]:
+    seen: List[str] = []
+
+    def walk(node: str) -> None:
+        for dep in plan[node]:
+            if dep not in seen:
+                walk(dep)
+                seen.append(dep)
+
+    walk(name)
+    order = list(plan)
+    return sorted(seen, key=order.index)
+
+
+def combine_fragments(plan: Dict[str, List[str]], fragments: Dict[str, Dict[str, Any]], names: Sequence[str],
+                      accumulate: Dict[str, str]) -> Dict[str, Any]:
+    """按拓扑序合并插件写入：accumulate中的字段用分隔符拼接，其余字段后写者覆盖先写者"""
+    merged: Dict[str, Any] = {}
+    for name in (n for n in plan if n in names):
+        for key, value in fragments.get(name, {}).items():
+            if key in accumulate and merged.get(key):
+                merged[key] = f"{merged[key]}{accumulate[key]}{value}" if value else merged[key]
+            else:
+                merged[key] = value
+    return merged
+
+
+def build_dag_graph(
+    registry: PluginRegistry,
+    preprocess: Callable[[Dict[str, Any]], Dict[str, Any]],
+    postprocess: Callable[[Dict[str, Any]], Dict[str, Any]],
+    names: Optional[Sequence[str]] = None,
+    resolve: Optional[Resolver] = None,
+    accumulate: Optional[Dict[str, str]] = None,
+    resolve_entry: Optional[EntryResolver] = None,
+) -> StateGraph:
+    """按插件依赖构建主图：互不依赖的插件并发执行，汇合后按拓扑序确定性地合并输出。
+
+    - resolve用于取得插件子图，默认从registry惰性编译
+    - resolve_entry用于取得插件的索引条目，默认使用构建主图时的快照；
+      节点执行时不读取registry.entries，注册表在运行中被修改不会影响已开始的运行
+    - accumulate声明按追加方式累积的字段及分隔符，默认{"output": "\\n -> "}
+    """
+    entries = dict(registry.entries)
+    plan = plan_plugin_dag(entries, names)
+    accumulate = accumulate if accumulate is not None else {"output": "\n -> "}
+    resolve = resolve or (lambda name, config: registry.compiled(name))
+    resolve_entry = resolve_entry or (lambda name, config: entries[name])
+    graph = StateGraph(DagState)
+
+    def plugin_input(name: str, entry: PluginEntry, state: Dict[str, Any]) -> Dict[str, Any]:
+        reads = set(entry["meta"].get("reads", []))
+        upstream = combine_fragments(plan, state.get("fragments", {}), _ancestors(plan, name), accumulate)
+        view = {**state, **upstream}
+        inputs = {}
+        for key in entry["state_schema"] or [k for k in view if k != "fragments"]:
+            if key in accumulate and key not in reads:
+                inputs[key] = ""  # 未声明读取的累积字段从空开始，插件只产出自身的部分
+            else:
+                inputs[key] = view.get(key, "")
+        return inputs
+
+    def plugin_fragment(name: str, entry: PluginEntry, given: Dict[str, Any],
+                        result: Dict[str, Any]) -> Dict[str, Any]:
+        writes = entry["meta"].get("writes") or [k for k in result if k != "fragments"]
+        fragment = {}
+        for key in writes:
+            value = result.get(key)
+            # 累积字段只保留插件本次追加的内容，避免与上游片段重复
+            prefix = f"{given.get(key)}{accumulate.get(key, '')}"
+            if key in accumulate and given.get(key) and isinstance(value, str) and value.startswith(prefix):
+                value = value[len(prefix):]
+            fragment[key] = value
+        return {"fragments": {name: fragment}}
+
+    def make_plugin_node(name: str) -> RunnableLambda:
+        def run(state: Dict[str, Any], config: RunnableConfig) -> Dict[str, Any]:
+            entry = resolve_entry(name, config)
+            given = plugin_input(name, entry, state)
+            return plugin_fragment(name, entry, given, resolve(name, config).invoke(given, config))
+
+        async def arun(state: Dict[str, Any], config: RunnableConfig) -> Dict[str, Any]:
+            entry = resolve_entry(name, config)
+            given = plugin_input(name, entry, state)
+            return plugin_fragment(name, entry, given, await resolve(name, config).ainvoke(given, config))
+
+        return RunnableLambda(run, afunc=arun, name=name)
+
+    def merge_and_postprocess(state: Dict[str, Any]) -> Dict[str, Any]:
+        merged = combine_fragments(plan, state.get("fragments", {}), list(plan), accumulate)
+        return postprocess({**state, **merged})
+
+    graph.add_node("preprocess", RunnableLambda(preprocess))
+    for name in plan:
+        graph.add_node(name, make_plugin_node(name))
+    graph.add_node("postprocess", RunnableLambda(merge_and_postprocess))
+
+    graph.set_entry_point("preprocess")
+    for name, deps in plan.items():
+        if not deps:
+            graph.add_edge("preprocess", name)
+        else:
+            graph.add_edge(deps if len(deps) > 1 else deps[0], name)
+    dependents = {dep for deps in plan.values() for dep in deps}
+    sinks = [name for name in plan if name not in dependents] or ["preprocess"]
+    graph.add_edge(sinks if len(sinks) > 1 else sinks[0], "postprocess")
+    graph.set_finish_point("postprocess")
+    return graph
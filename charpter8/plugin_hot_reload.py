@@ -0,0 +1,136 @@
+import logging
+import os
+import threading
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from langchain_core.runnables import Runnable, RunnableConfig
+from langgraph.graph import StateGraph
+
+from plugin_dag import EntryResolver, Resolver
+from plugin_index import PluginEntry, PluginRegistry, PluginScanError, build_index, scan_plugin_file
+
+# 主图构建函数：接收注册表、插件解析函数与索引条目解析函数，返回未编译的主图
+MainGraphBuilder = Callable[[PluginRegistry, Resolver, EntryResolver], StateGraph]
+
+# 一次运行所固定使用的版本：编译后的主图 + 插件名 -> 编译后的插件子图 + 插件名 -> 索引条目
+Version = Tuple[Any, Mapping[str, Runnable], Mapping[str, PluginEntry]]
+
+
+def _snapshot_resolve(name: str, config: RunnableConfig) -> Runnable:
+    return config["configurable"]["plugin_snapshot"][name]
+
+
+def _snapshot_resolve_entry(name: str, config: RunnableConfig) -> PluginEntry:
+    return config["configurable"]["plugin_entries"][name]
+
+
+class HotReloadPluginHost:
+    """支持插件热更新的宿主。
+
+    - 插件文件修改后只重新编译该插件的子图，生成新的插件快照并原子替换
+    - 主图只在插件增删或依赖声明变化时重建
+    - 每次运行开始时固定当前版本，运行中的请求始终使用旧版本完成，新请求使用新版本
+    """
+
+    def __init__(self, registry: PluginRegistry, build_main: MainGraphBuilder, poll_interval: float = 1.0):
+        self.registry = registry
+        self.build_main = build_main
+        self.poll_interval = poll_interval
+        self._swap_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        snapshot = {name: registry.compiled(name) for name in registry}
+        entries = MappingProxyType(dict(registry.entries))
+        self._current: Version = (self._compile_main(), MappingProxyType(snapshot), entries)
+
+    def _compile_main(self) -> Any:
+        return self.build_main(self.registry, _snapshot_resolve, _snapshot_resolve_entry).compile()
+
+    def current(self) -> Version:
+        return self._current
+
+    def _pinned_config(self, config: Optional[RunnableConfig]) -> Tuple[Any, RunnableConfig]:
+        app, snapshot, entries = self._current  # 单次读取引用，整个运行期间使用同一版本
+        config = dict(config or {})
+        config["configurable"] = {**config.get("configurable", {}), "plugin_snapshot": snapshot,
+                                  "plugin_entries": entries}
+        return app, config
+
+    def invoke(self, inputs: Dict[str, Any], config: Optional[RunnableConfig] = None) -> Dict[str, Any]:
+        app, config = self._pinned_config(config)
+        return app.invoke(inputs, config)
+
+    async def ainvoke(self, inputs: Dict[str, Any], config: Optional[RunnableConfig] = None) -> Dict[str, Any]:
+        app, config = self._pinned_config(config)
+        return await app.ainvoke(inputs, config)
+
+    def check_for_changes(self) -> List[str]:
+        """检查插件目录，重新编译发生变化的插件并切换版本，返回已更新的插件名"""
+        with self._swap_lock:
+            _, snapshot, old_entries = self._current
+            new_snapshot: Dict[str, Runnable] = dict(snapshot)
+            new_entries: Dict[str, PluginEntry] = dict(old_entries)
+            changed: List[str] = []
+            rebuild_main = False
+
+            entries = build_index(self.registry.plugin_dir, self.registry.index_path)
+            if set(entries) != set(snapshot):
+                rebuild_main = True
+                for name in set(snapshot) - set(entries):
+                    del new_snapshot[name]
+                    del new_entries[name]
+                    self.registry.entries.pop(name, None)
+                    changed.append(name)
+
+            for name, entry in entries.items():
+                old = self.registry.entries.get(name)
+                if old and name in snapshot:
+                    # 原地修改不会改变目录修改时间，逐个核对文件状态
+                    stat = os.stat(old["path"])
+                    if stat.st_mtime_ns == old["mtime_ns"] and stat.st_size == old["size"]:
+                        continue
+                    try:
+                        entry = scan_plugin_file(old["path"], old["entry_point"])
+                    except PluginScanError:
+                        logging.exception(f"插件{name}解析失败，继续使用旧版本")
+                        continue
+                    if entry is None or entry["sha256"] == old["sha256"]:
+                        if entry:
+                            self.registry.entries[name] = entry
+                            new_entries[name] = entry
+                        continue
+                try:
+                    new_snapshot[name] = self.registry.reload(name, entry)
+                except Exception:
+                    logging.exception(f"插件{name}重新加载失败，继续使用旧版本")
+                    continue
+                new_entries[name] = entry
+                if old is None or old["meta"] != entry["meta"]:
+                    rebuild_main = True
+                changed.append(name)
+
+            if changed:
+                app = self._compile_main() if rebuild_main else self._current[0]
+                self._current = (app, MappingProxyType(new_snapshot), MappingProxyType(new_entries))
+                logging.info(f"插件已更新：{changed}{'（主图已重建）' if rebuild_main else ''}")
+            return changed
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.check_for_changes()
+            except Exception:
+                logging.exception("插件目录检查失败")
+
+    def start(self) -> None:
+        if self._watcher is None:
+            self._stop.clear()
+            self._watcher = threading.Thread(target=self._watch, name="plugin-watcher", daemon=True)
+            self._watcher.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
@@ -0,0 +1,228 @@
+import ast
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, TypedDict
+
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from langgraph.graph import StateGraph
+
+INDEX_VERSION = 1
+
+
+# 插件索引条目：无需导入插件即可获得的元信息
+class PluginEntry(TypedDict):
+    name: str
+    path: str
+    entry_point: str
+    state_schema: Dict[str, str]
+    meta: Dict[str, Any]
+    sha256: str
+    mtime_ns: int
+    size: int
+
+
+class PluginScanError(ValueError):
+    """插件文件无法解析：存在语法错误，或PLUGIN_META不是字面量"""
+
+
+def scan_plugin_file(path: str, entry_point: str = "build_graph") -> Optional[PluginEntry]:
+    """通过语法树解析插件文件（不执行代码），提取入口函数、状态结构与PLUGIN_META声明"""
+    with open(path, "rb") as f:
+        source = f.read()
+    try:
+        return _scan_source(path, source, entry_point)
+    except (SyntaxError, ValueError) as e:
+        raise PluginScanError(f"插件文件{path}解析失败：{type(e).__name__}: {e}") from e
+
+
+def _scan_source(path: str, source: bytes, entry_point: str) -> Optional[PluginEntry]:
+    tree = ast.parse(source, filename=path)
+    has_entry = False
+    state_schema: Dict[str, str] = {}
+    meta: Dict[str, Any] = {}
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name == entry_point:
+            has_entry = True
+        elif isinstance(node, ast.ClassDef) and not state_schema and \
+                any(ast.unparse(base).endswith("TypedDict") for base in node.bases):
+            state_schema = {
+                stmt.target.id: ast.unparse(stmt.annotation)
+                for stmt in node.body
+                if isinstance(stmt, ast.AnnAssign) and isinstance(stmt.target, ast.Name)
+            }
+        elif isinstance(node, ast.Assign) and \
+                any(isinstance(t, ast.Name) and t.id == "PLUGIN_META" for t in node.targets):
+            meta = ast.literal_eval(node.value)
+    if not has_entry:
+        return None
+    stat = os.stat(path)
+    return {
+        "name": os.path.splitext(os.path.basename(path))[0],
+        "path": path,
+        "entry_point": entry_point,
+        "state_schema": state_schema,
+        "meta": meta,
+        "sha256": hashlib.sha256(source).hexdigest(),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+    }
+
+
+def _is_plugin_file(file: str) -> bool:
+    return file.endswith(".py") and not file.startswith(("_", "."))
+
+
+def _stat_changed(record: Dict[str, Any]) -> bool:
+    try:
+        stat = os.stat(record["path"])
+    except OSError:
+        return True
+    return stat.st_mtime_ns != record["mtime_ns"] or stat.st_size != record["size"]
+
+
+def build_index(plugin_dir: str, index_path: str) -> Dict[str, PluginEntry]:
+    """读取或重建插件索引。
+
+    插件目录的修改时间未变化时直接返回磁盘上的索引，启动开销与插件数量无关；
+    否则只重新解析修改时间或大小发生变化的文件，并原子地写回索引。
+    无法解析的插件记录在索引的broken中并被跳过，不影响其他插件；其文件被修改后会重新解析。
+    """
+    plugin_dir = os.path.abspath(plugin_dir)
+    dir_mtime_ns = os.stat(plugin_dir).st_mtime_ns
+    cached: Dict[str, Any] = {}
+    if os.path.exists(index_path):
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            cached = {}
+    if cached.get("version") == INDEX_VERSION and cached.get("plugin_dir") == plugin_dir \
+            and cached.get("dir_mtime_ns") == dir_mtime_ns \
+            and not any(_stat_changed(record) for record in cached.get("broken", {}).values()):
+        return cached["plugins"]
+
+    same_version = cached.get("version") == INDEX_VERSION
+    old_entries: Dict[str, PluginEntry] = cached.get("plugins", {}) if same_version else {}
+    old_broken: Dict[str, Dict[str, Any]] = cached.get("broken", {}) if same_version else {}
+    plugins: Dict[str, PluginEntry] = {}
+    broken: Dict[str, Dict[str, Any]] = {}
+    for file in sorted(os.listdir(plugin_dir)):
+        if not _is_plugin_file(file):
+            continue
+        path = os.path.join(plugin_dir, file)
+        name = os.path.splitext(file)[0]
+        stat = os.stat(path)
+        old = old_entries.get(name)
+        if old and old["mtime_ns"] == stat.st_mtime_ns and old["size"] == stat.st_size:
+            plugins[name] = old
+            continue
+        record = old_broken.get(name)
+        if record is None or _stat_changed(record):
+            try:
+                entry = scan_plugin_file(path)
+                record = None
+            except PluginScanError as e:
+                record = {"path": path, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "error": str(e)}
+        if record is not None:
+            logging.warning(f"跳过无法解析的插件{name}：{record['error']}")
+            broken[name] = record
+        elif entry:
+            plugins[name] = entry
+
+    tmp_path = f"{index_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": INDEX_VERSION, "plugin_dir": plugin_dir,
+                   "dir_mtime_ns": dir_mtime_ns, "plugins": plugins, "broken": broken}, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, index_path)
+    return plugins
+
+
+class PluginRegistry(Mapping[str, Callable[[], StateGraph]]):
+    """基于索引的惰性插件注册表：启动时只读索引，插件模块在首次使用时才导入并编译。
+
+    作为Mapping使用时，值为插件的build_graph函数，可直接替换load_plugin_modules的返回值。
+    """
+
+    def __init__(self, plugin_dir: str, index_path: Optional[str] = None):
+        self.plugin_dir = os.path.abspath(plugin_dir)
+        self.index_path = index_path or os.path.join(os.path.dirname(self.plugin_dir), ".plugin_index.json")
+        self.entries: Dict[str, PluginEntry] = build_index(self.plugin_dir, self.index_path)
+        self._modules: Dict[str, Any] = {}
+        self._compiled: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _ensure_fresh(self, name: str) -> PluginEntry:
+        # 原地修改文件不会改变目录修改时间，首次使用时再核对一次文件本身
+        entry = self.entries[name]
+        stat = os.stat(entry["path"])
+        if stat.st_mtime_ns != entry["mtime_ns"] or stat.st_size != entry["size"]:
+            entry = scan_plugin_file(entry["path"], entry["entry_point"])
+            if entry is None:
+                raise KeyError(f"插件{name}已不再提供入口函数")
+            self.entries[name] = entry
+        return entry
+
+    def load_module(self, name: str) -> Any:
+        with self._lock:
+            if name not in self._modules:
+                entry = self._ensure_fresh(name)
+                spec = importlib.util.spec_from_file_location(name, entry["path"])
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+                self._modules[name] = module
+            return self._modules[name]
+
+    def build_graph(self, name: str) -> StateGraph:
+        module = self.load_module(name)
+        return getattr(module, self.entries[name]["entry_point"])()
+
+    def compiled(self, name: str) -> Any:
+        if name not in self._compiled:
+            graph = self.build_graph(name).compile()
+            with self._lock:
+                self._compiled.setdefault(name, graph)
+        return self._compiled[name]
+
+    def reload(self, name: str, entry: Optional[PluginEntry] = None) -> Any:
+        """重新导入并编译单个插件，返回新的编译结果；已持有旧版本的调用方不受影响"""
+        entry = entry or scan_plugin_file(self.entries[name]["path"], self.entries[name]["entry_point"])
+        if entry is None:
+            raise KeyError(f"插件{name}已不再提供入口函数")
+        spec = importlib.util.spec_from_file_location(name, entry["path"])
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        graph = getattr(module, entry["entry_point"])().compile()
+        with self._lock:
+            self.entries[name] = entry
+            self._modules[name] = module
+            self._compiled[name] = graph
+        return graph
+
+    def loaded(self) -> List[str]:
+        return list(self._modules)
+
+    def __getitem__(self, name: str) -> Callable[[], StateGraph]:
+        if name not in self.entries:
+            raise KeyError(name)
+        return lambda: self.build_graph(name)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+def lazy_plugin_node(registry: PluginRegistry, name: str) -> RunnableLambda:
+    """插件节点：首次执行时才导入并编译插件子图"""
+    def run(state: Dict[str, Any], config: RunnableConfig) -> Dict[str, Any]:
+        return registry.compiled(name).invoke(state, config)
+
+    async def arun(state: Dict[str, Any], config: RunnableConfig) -> Dict[str, Any]:
+        return await registry.compiled(name).ainvoke(state, config)
+
+    return RunnableLambda(run, afunc=arun, name=name)
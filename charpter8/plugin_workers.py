@@ -0,0 +1,173 @@
+import asyncio
+import importlib.util
+import logging
+import multiprocessing
+import queue
+import threading
+from multiprocessing.connection import Connection
+from typing import Any, Dict, List, Optional
+
+import ormsgpack
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+
+from plugin_index import PluginRegistry
+
+# 子进程统一使用spawn启动，避免fork带入宿主进程中的线程与锁
+_mp = multiprocessing.get_context("spawn")
+
+
+class PluginWorkerError(RuntimeError):
+    pass
+
+
+class PluginCrashedError(PluginWorkerError):
+    pass
+
+
+class PluginTimeoutError(PluginWorkerError):
+    pass
+
+
+def _worker_main(conn: Connection, name: str, path: str, entry_point: str) -> None:
+    """worker进程主循环：加载并编译插件子图，逐个处理宿主发来的状态"""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    graph = getattr(module, entry_point)().compile()
+    conn.send_bytes(ormsgpack.packb({"ready": True}))
+    while True:
+        try:
+            request = ormsgpack.unpackb(conn.recv_bytes())
+        except EOFError:
+            break  # 宿主关闭了连接
+        try:
+            reply = {"ok": True, "result": graph.invoke(request["state"])}
+        except Exception as e:
+            reply = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        conn.send_bytes(ormsgpack.packb(reply))
+
+
+class _Worker:
+    def __init__(self, name: str, path: str, entry_point: str, start_timeout: float):
+        self.conn, child_conn = _mp.Pipe()
+        self.process = _mp.Process(target=_worker_main, args=(child_conn, name, path, entry_point),
+                                   name=f"plugin-{name}", daemon=True)
+        self.process.start()
+        child_conn.close()
+        if not self.conn.poll(start_timeout):
+            self.kill()
+            raise PluginTimeoutError(f"插件{name}的worker启动超时")
+        try:
+            ormsgpack.unpackb(self.conn.recv_bytes())
+        except (EOFError, OSError) as e:
+            self.kill()
+            raise PluginCrashedError(f"插件{name}的worker启动失败") from e
+
+    def kill(self) -> None:
+        self.conn.close()
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+
+
+class PluginWorkerPool:
+    """进程外插件执行池：每个插件拥有独立的一组worker进程。
+
+    - 状态经本地管道以msgpack二进制格式传递
+    - 每个插件的并发数等于其worker数量，超出的请求排队等待空闲worker
+    - worker崩溃或超时只影响当前请求，随后自动补充新的worker，宿主进程不受影响
+    - 补充worker连续失败spawn_retries + 1次时放弃，该插件的worker数减一；
+      全部worker都无法启动时，该插件的请求直接报错而不是一直等待
+    """
+
+    def __init__(self, registry: PluginRegistry, workers_per_plugin: int = 2,
+                 plugin_workers: Optional[Dict[str, int]] = None,
+                 request_timeout: float = 30.0, start_timeout: float = 30.0, spawn_retries: int = 1):
+        self.registry = registry
+        self.request_timeout = request_timeout
+        self.start_timeout = start_timeout
+        self.spawn_retries = spawn_retries
+        self._idle: Dict[str, "queue.Queue[Optional[_Worker]]"] = {}
+        self._all: Dict[str, List[_Worker]] = {}
+        self._lock = threading.Lock()
+        for name in registry:
+            count = (plugin_workers or {}).get(name, workers_per_plugin)
+            self._idle[name] = queue.Queue()
+            self._all[name] = []
+            for _ in range(count):
+                self._idle[name].put(self._spawn(name))
+
+    def _spawn(self, name: str) -> _Worker:
+        entry = self.registry.entries[name]
+        worker = _Worker(name, entry["path"], entry["entry_point"], self.start_timeout)
+        with self._lock:
+            self._all[name].append(worker)
+        return worker
+
+    def _replace(self, name: str, worker: _Worker) -> Optional[_Worker]:
+        """结束worker并启动替代进程；多次启动失败时返回None，不再把该名额放回空闲队列"""
+        worker.kill()
+        replacement = None
+        for attempt in range(self.spawn_retries + 1):
+            try:
+                replacement = self._spawn(name)
+                break
+            except Exception:
+                logging.exception(f"插件{name}的worker启动失败（第{attempt + 1}次）")
+        with self._lock:
+            self._all[name].remove(worker)
+            remaining = len(self._all[name])
+        if replacement is None and remaining == 0:
+            self._idle[name].put(None)  # 唤醒等待中的请求，避免永远阻塞
+        return replacement
+
+    def invoke(self, name: str, state: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        timeout = timeout or self.request_timeout
+        worker = self._idle[name].get()  # 等待空闲worker，即按插件限制并发
+        if worker is None:
+            self._idle[name].put(None)
+            raise PluginCrashedError(f"插件{name}没有可用的worker")
+        try:
+            if not worker.process.is_alive():
+                worker = self._replace(name, worker)  # 空闲期间退出的worker在使用前替换
+                if worker is None:
+                    raise PluginCrashedError(f"插件{name}的worker无法重新启动")
+            try:
+                worker.conn.send_bytes(ormsgpack.packb({"state": state}))
+                if not worker.conn.poll(timeout):
+                    worker = self._replace(name, worker)
+                    raise PluginTimeoutError(f"插件{name}执行超时（{timeout}s）")
+                reply = ormsgpack.unpackb(worker.conn.recv_bytes())
+            except (EOFError, OSError) as e:
+                logging.warning(f"插件{name}的worker进程退出，已重新启动")
+                worker = self._replace(name, worker)
+                raise PluginCrashedError(f"插件{name}的worker进程崩溃") from e
+        finally:
+            if worker is not None:
+                self._idle[name].put(worker)
+        if not reply["ok"]:
+            raise PluginWorkerError(f"插件{name}执行失败：{reply['error']}")
+        return reply["result"]
+
+    async def ainvoke(self, name: str, state: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        return await asyncio.to_thread(self.invoke, name, state, timeout)
+
+    def resolve(self, name: str, config: RunnableConfig) -> RunnableLambda:
+        """可作为build_dag_graph的resolve参数，使插件在worker进程中执行"""
+        def run(state: Dict[str, Any]) -> Dict[str, Any]:
+            return self.invoke(name, state)
+
+        async def arun(state: Dict[str, Any]) -> Dict[str, Any]:
+            return await self.ainvoke(name, state)
+
+        return RunnableLambda(run, afunc=arun, name=name)
+
+    def close(self) -> None:
+        with self._lock:
+            workers = [w for ws in self._all.values() for w in ws]
+            self._all = {name: [] for name in self._all}
+        for worker in workers:
+            worker.conn.close()  # worker读取到EOF后自行退出
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.kill()
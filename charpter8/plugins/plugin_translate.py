@@ -6,6 +6,9 @@ class WorkflowState(TypedDict):
     input: str
     output: str
 
+# 插件声明：读取/写入的状态字段与前置插件，主程序据此决定能否并发执行
+PLUGIN_META = {"reads": ["input"], "writes": ["output"], "after": []}
+
 def build_graph() -> StateGraph:
     """构建并返回翻译处理子图"""
     graph = StateGraph(WorkflowState)